@@ -3,16 +3,20 @@ AI-Powered API Analysis Service
 Actually uses LLM to provide intelligent, context-aware analysis
 """
 
+import asyncio
+import hashlib
 import json
 import os
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 import structlog
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from infrastructure.llm_manager import LLMRequest, SimpleLLMManager, ModelConfig
+from infrastructure.semantic_cache import get_semantic_cache
 from typing import List
 
 # Vector RAG imports (with fallback for optional dependencies)
@@ -21,6 +25,8 @@ try:
     from infrastructure.hybrid_search import get_hybrid_search_engine
     from infrastructure.context_assembler import get_context_assembler
     from infrastructure.cache_layer import get_cache
+    from infrastructure.deepeval_enhanced import get_deep_eval_enhanced
+    from infrastructure.performance_monitor import get_performance_monitor
     VECTOR_RAG_AVAILABLE = True
 except ImportError as e:
     VECTOR_RAG_AVAILABLE = False
@@ -68,6 +74,49 @@ def get_optimal_llm_params(model: str, base_max_tokens: int = 2000) -> Dict[str,
     return params
 
 
+def spec_fingerprint(spec: Optional[Dict[str, Any]]) -> str:
+    """Stable hash of an OpenAPI spec, used to scope caches to a single spec"""
+    if not spec:
+        return ""
+    spec_str = json.dumps(spec, sort_keys=True)
+    return hashlib.md5(spec_str.encode()).hexdigest()
+
+
+def sse_event(payload: Dict[str, Any]) -> str:
+    """Encode a payload as a server-sent event line"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+# In-flight work keyed by request identity, so concurrent duplicates share one result
+_inflight_tasks: Dict[Any, asyncio.Task] = {}
+
+
+async def single_flight(key: Any, factory: Callable[[], Awaitable[Any]]) -> Any:
+    """Run factory once for concurrent callers with the same key and share its result"""
+    task = _inflight_tasks.get(key)
+    if task is None:
+        task = asyncio.ensure_future(factory())
+        _inflight_tasks[key] = task
+        task.add_done_callback(lambda _: _inflight_tasks.pop(key, None))
+    # Shield so one disconnecting caller doesn't cancel the work for the others
+    return await asyncio.shield(task)
+
+
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", "logs/semcache.pkl")
+
+# Kept first in every RAG prompt so the provider's prompt prefix cache can reuse it
+RAG_PROMPT_INSTRUCTIONS = """You are an expert API documentation assistant. Your role is to provide helpful, accurate answers about API usage and implementation.
+
+Please provide a helpful, practical response that:
+1. Directly answers the user's question
+2. Uses information from the API specification when available
+3. Provides code examples when appropriate (Python requests, curl, etc.)
+4. Explains any relevant authentication, parameters, or data structures
+5. Is clear and actionable for developers
+
+If the question cannot be answered from the provided API specification, politely explain what information would be needed."""
+
+
 # FastAPI app
 app = FastAPI(
     title="APISage - AI-Powered OpenAPI Analysis",
@@ -171,6 +220,37 @@ async def get_api_key_status():
     }
 
 
+PAGINATION_PARAM_NAMES = frozenset({"limit", "offset", "page", "cursor"})
+
+
+def detect_spec_features(spec: Dict[str, Any]) -> Tuple[bool, bool, bool]:
+    """Report whether a spec has authentication, error responses and pagination
+
+    Walks the operations once and stops as soon as all three have been seen.
+    """
+    has_authentication = bool(spec.get("security"))
+    has_error_responses = False
+    has_pagination = False
+
+    for methods in spec.get("paths", {}).values():
+        for method in methods.values():
+            if not has_authentication and "security" in method:
+                has_authentication = True
+            if not has_error_responses and any(
+                status.startswith(("4", "5")) for status in method.get("responses", {})
+            ):
+                has_error_responses = True
+            if not has_pagination and any(
+                param.get("name") in PAGINATION_PARAM_NAMES
+                for param in method.get("parameters", [])
+            ):
+                has_pagination = True
+            if has_authentication and has_error_responses and has_pagination:
+                return True, True, True
+
+    return has_authentication, has_error_responses, has_pagination
+
+
 def create_analysis_prompt(
     spec: Dict[str, Any], analysis_depth: str, focus_areas: list = None
 ) -> str:
@@ -186,31 +266,7 @@ def create_analysis_prompt(
     total_methods = sum(len(methods) for methods in paths.values())
 
     # Analyze what's actually in the spec
-    has_authentication = bool(
-        spec.get("security")
-        or any(
-            any("security" in method for method in methods.values())
-            for methods in paths.values()
-        )
-    )
-
-    has_error_responses = any(
-        any(
-            status.startswith(("4", "5"))
-            for status in method.get("responses", {}).keys()
-        )
-        for methods in paths.values()
-        for method in methods.values()
-    )
-
-    has_pagination = any(
-        any(
-            param.get("name") in ["limit", "offset", "page", "cursor"]
-            for param in method.get("parameters", [])
-        )
-        for methods in paths.values()
-        for method in methods.values()
-    )
+    has_authentication, has_error_responses, has_pagination = detect_spec_features(spec)
 
     # Build the prompt with specific analysis requirements
     prompt = f"""You are an expert API architect conducting a thorough technical review. 
@@ -344,16 +400,17 @@ def parse_llm_response(llm_response: str) -> Dict[str, Any]:
     if current_section:
         sections[current_section] = "\n".join(current_content)
 
-    # Extract key findings
+    # Extract key findings; lowercase the (potentially large) response only once
+    response_lower = llm_response.lower()
     key_findings = {
         "critical_issues_count": llm_response.count("Critical:")
         + llm_response.count("CRITICAL"),
         "security_issues_count": llm_response.count("Security:")
         + llm_response.count("vulnerability"),
-        "has_authentication": "authentication" in llm_response.lower()
-        and "missing" not in llm_response.lower(),
+        "has_authentication": "authentication" in response_lower
+        and "missing" not in response_lower,
         "documentation_quality": "good"
-        if "good documentation" in llm_response.lower()
+        if "good documentation" in response_lower
         else "needs improvement",
     }
 
@@ -439,25 +496,23 @@ async def analyze_api(request: AnalysisRequest):
 @app.post("/analyze-stream")
 async def analyze_api_stream(request: AnalysisRequest):
     """Streaming AI-powered API analysis using LLM"""
-    from fastapi.responses import StreamingResponse
-    
     # Check if LLM is available
     if not llm_manager.is_available():
         async def error_stream():
-            yield f"data: {{'error': 'LLM service not available. Please set your OpenAI API key first.'}}\n\n"
+            yield sse_event({"error": "LLM service not available. Please set your OpenAI API key first."})
         return StreamingResponse(error_stream(), media_type="text/plain")
 
     async def generate_stream():
         try:
             # Send initial status
-            yield f"data: {{'status': 'starting', 'message': 'Initializing analysis...'}}\n\n"
+            yield sse_event({"status": "starting", "message": "Initializing analysis..."})
             
             # Create the analysis prompt
             prompt = create_analysis_prompt(
                 request.openapi_spec, request.analysis_depth, request.focus_areas
             )
             
-            yield f"data: {{'status': 'analyzing', 'message': 'Analyzing API specification...'}}\n\n"
+            yield sse_event({"status": "analyzing", "message": "Analyzing API specification..."})
 
             # Create LLM request
             llm_request = LLMRequest(
@@ -470,11 +525,11 @@ async def analyze_api_stream(request: AnalysisRequest):
             async for chunk in llm_manager.generate_stream(llm_request):
                 yield chunk
 
-            yield f"data: {{'status': 'complete', 'message': 'Analysis complete'}}\n\n"
+            yield sse_event({"status": "complete", "message": "Analysis complete"})
 
         except Exception as e:
             logger.error("Streaming analysis failed", error=str(e), exc_info=True)
-            yield f"data: {{'error': 'Analysis failed: {str(e)}'}}\n\n"
+            yield sse_event({"error": f"Analysis failed: {str(e)}"})
 
     return StreamingResponse(generate_stream(), media_type="text/plain")
 
@@ -493,6 +548,116 @@ async def analyze_api_stream(request: AnalysisRequest):
 
 
 
+async def generate_rag_response(
+    request: RAGRequest, cache_namespace: str, start_time: float
+) -> RAGResponse:
+    """Answer a RAG question with the LLM and store the answer in the semantic cache"""
+    # Check if we have API specification context
+    has_context = request.openapi_spec is not None
+    context_str = ""
+    
+    if has_context:
+        # Extract relevant information from the OpenAPI spec
+        spec = request.openapi_spec
+        api_info = spec.get("info", {})
+        paths = spec.get("paths", {})
+        components = spec.get("components", {})
+        
+        logger.info("Processing OpenAPI spec context",
+                   api_title=api_info.get("title", "Unknown"),
+                   api_version=api_info.get("version", "Unknown"),
+                   endpoints_count=len(paths),
+                   has_components=bool(components))
+        
+        # Build context string from spec
+        context_str = f"""
+API Title: {api_info.get('title', 'Unknown')}
+Version: {api_info.get('version', 'Unknown')}
+Description: {api_info.get('description', 'No description')}
+
+Endpoints ({len(paths)} total):
+"""
+        
+        # Add endpoint summaries
+        for path, methods in paths.items():
+            for method, details in methods.items():
+                if isinstance(details, dict) and 'summary' in details:
+                    context_str += f"- {method.upper()} {path}: {details.get('summary', 'No summary')}\n"
+        
+        # Add schema information
+        schemas = components.get("schemas", {})
+        if schemas:
+            context_str += f"\nData Models ({len(schemas)} total):\n"
+            for schema_name in schemas.keys():
+                context_str += f"- {schema_name}\n"
+    
+    # Static instructions, then per-spec context, then the question, so the
+    # longest possible prefix is identical across queries about one spec
+    rag_prompt = f"""{RAG_PROMPT_INSTRUCTIONS}
+
+{"CONTEXT - API SPECIFICATION:" + context_str if has_context else "Note: No API specification provided as context."}
+
+USER QUESTION: {request.question}"""
+
+    # Generate response using LLM
+    llm_request = LLMRequest(
+        prompt=rag_prompt,
+        **get_optimal_llm_params(llm_manager.default_model, 1500)
+    )
+    
+    logger.info("Generating LLM response",
+               model=llm_manager.default_model,
+               prompt_length=len(rag_prompt),
+               max_tokens=llm_request.max_tokens)
+    
+    response = await llm_manager.generate(llm_request)
+    response_time = time.time() - start_time
+    
+    logger.info("LLM response received",
+               response_time=response_time,
+               has_response=response is not None,
+               has_content=response.content if response else None,
+               usage_info=response.usage if response and response.usage else None)
+    
+    if not response or not response.content:
+        logger.error("LLM failed to generate response",
+                    response_exists=response is not None,
+                    content_exists=response.content if response else None)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate response"
+        )
+    
+    logger.info("RAG query completed", 
+               response_time=response_time,
+               has_context=has_context,
+               model=llm_manager.default_model)
+    
+    rag_response = RAGResponse(
+        status="success",
+        answer=response.content,
+        context_used=has_context,
+        response_time=response_time,
+        model_used=llm_manager.default_model,
+        metadata={
+            "question_length": len(request.question),
+            "context_length": len(context_str) if has_context else 0,
+            "response_length": len(response.content),
+            "prompt_tokens": response.usage.get("prompt_tokens") if response.usage else None,
+            "completion_tokens": response.usage.get("completion_tokens") if response.usage else None,
+            "total_tokens": response.usage.get("total_tokens") if response.usage else None
+        }
+    )
+    try:
+        await asyncio.to_thread(
+            get_semantic_cache().put, request.question, rag_response.model_dump(), cache_namespace
+        )
+    except Exception as e:
+        logger.warning("Failed to cache RAG response", error=str(e))
+    
+    return rag_response
+
+
 @app.post("/rag-query", response_model=RAGResponse)
 async def rag_query(request: RAGRequest):
     """
@@ -514,109 +679,29 @@ async def rag_query(request: RAGRequest):
     try:
         start_time = time.time()
         
-        # Check if we have API specification context
-        has_context = request.openapi_spec is not None
-        context_str = ""
-        
-        if has_context:
-            # Extract relevant information from the OpenAPI spec
-            spec = request.openapi_spec
-            api_info = spec.get("info", {})
-            paths = spec.get("paths", {})
-            components = spec.get("components", {})
-            
-            logger.info("Processing OpenAPI spec context",
-                       api_title=api_info.get("title", "Unknown"),
-                       api_version=api_info.get("version", "Unknown"),
-                       endpoints_count=len(paths),
-                       has_components=bool(components))
-            
-            # Build context string from spec
-            context_str = f"""
-API Title: {api_info.get('title', 'Unknown')}
-Version: {api_info.get('version', 'Unknown')}
-Description: {api_info.get('description', 'No description')}
-
-Endpoints ({len(paths)} total):
-"""
-            
-            # Add endpoint summaries
-            for path, methods in paths.items():
-                for method, details in methods.items():
-                    if isinstance(details, dict) and 'summary' in details:
-                        context_str += f"- {method.upper()} {path}: {details.get('summary', 'No summary')}\n"
-            
-            # Add schema information
-            schemas = components.get("schemas", {})
-            if schemas:
-                context_str += f"\nData Models ({len(schemas)} total):\n"
-                for schema_name in schemas.keys():
-                    context_str += f"- {schema_name}\n"
-        
-        # Create RAG-style prompt
-        rag_prompt = f"""You are an expert API documentation assistant. Your role is to provide helpful, accurate answers about API usage and implementation.
-
-{"CONTEXT - API SPECIFICATION:" + context_str if has_context else "Note: No API specification provided as context."}
-
-USER QUESTION: {request.question}
-
-Please provide a helpful, practical response that:
-1. Directly answers the user's question
-2. Uses information from the API specification when available
-3. Provides code examples when appropriate (Python requests, curl, etc.)
-4. Explains any relevant authentication, parameters, or data structures
-5. Is clear and actionable for developers
-
-If the question cannot be answered from the provided API specification, politely explain what information would be needed."""
-
-        # Generate response using LLM
-        llm_request = LLMRequest(
-            prompt=rag_prompt,
-            **get_optimal_llm_params(llm_manager.default_model, 1500)
-        )
-        
-        logger.info("Generating LLM response",
-                   model=llm_manager.default_model,
-                   prompt_length=len(rag_prompt),
-                   max_tokens=llm_request.max_tokens)
-        
-        response = await llm_manager.generate(llm_request)
-        response_time = time.time() - start_time
-        
-        logger.info("LLM response received",
-                   response_time=response_time,
-                   has_response=response is not None,
-                   has_content=response.content if response else None,
-                   usage_info=response.usage if response and response.usage else None)
-        
-        if not response or not response.content:
-            logger.error("LLM failed to generate response",
-                        response_exists=response is not None,
-                        content_exists=response.content if response else None)
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to generate response"
+        # Serve near-duplicate questions about the same spec from the semantic cache
+        semantic_cache = get_semantic_cache()
+        cache_namespace = spec_fingerprint(request.openapi_spec)
+        try:
+            cached = await asyncio.to_thread(semantic_cache.get, request.question, cache_namespace)
+        except Exception as e:
+            logger.warning("Semantic cache lookup failed", error=str(e))
+            cached = None
+        if cached:
+            response_time = time.time() - start_time
+            logger.info("RAG query served from semantic cache", response_time=response_time)
+            return RAGResponse(
+                **{
+                    **cached,
+                    "response_time": response_time,
+                    "metadata": {**(cached.get("metadata") or {}), "semantic_cache_hit": True},
+                }
             )
         
-        logger.info("RAG query completed", 
-                   response_time=response_time,
-                   has_context=has_context,
-                   model=llm_manager.default_model)
-        
-        return RAGResponse(
-            status="success",
-            answer=response.content,
-            context_used=has_context,
-            response_time=response_time,
-            model_used=llm_manager.default_model,
-            metadata={
-                "question_length": len(request.question),
-                "context_length": len(context_str) if has_context else 0,
-                "response_length": len(response.content),
-                "prompt_tokens": response.usage.get("prompt_tokens") if response.usage else None,
-                "completion_tokens": response.usage.get("completion_tokens") if response.usage else None,
-                "total_tokens": response.usage.get("total_tokens") if response.usage else None
-            }
+        # Concurrent identical questions share a single LLM call
+        return await single_flight(
+            (cache_namespace, semantic_cache.normalize_query(request.question)),
+            lambda: generate_rag_response(request, cache_namespace, start_time),
         )
         
     except HTTPException:
@@ -662,20 +747,14 @@ async def vector_rag_query(request: RAGRequest):
         start_time = time.time()
         
         # Generate API spec hash for caching and indexing
-        import hashlib
-        spec_str = json.dumps(request.openapi_spec, sort_keys=True)
-        api_spec_hash = hashlib.md5(spec_str.encode()).hexdigest()
+        api_spec_hash = spec_fingerprint(request.openapi_spec)
         api_name = request.openapi_spec.get('info', {}).get('title', 'Unknown API')
         
         # Initialize components
-        # Use semantic cache for better query optimization\n        from infrastructure.semantic_cache import get_semantic_cache\n        cache = get_semantic_cache()
         hybrid_search = get_hybrid_search_engine()
         context_assembler = get_context_assembler()
         
         # Initialize relevancy evaluation and performance monitoring
-        from infrastructure.deepeval_enhanced import get_deep_eval_enhanced
-        from infrastructure.performance_monitor import get_performance_monitor
-        
         deep_evaluator = get_deep_eval_enhanced(llm_manager)
         performance_monitor = get_performance_monitor()
         
@@ -798,7 +877,6 @@ async def vector_rag_query(request: RAGRequest):
         
         # Run comprehensive RAG evaluation
         try:
-            import asyncio
             relevancy_score = await deep_evaluator.evaluate_rag_triad(
                 query=request.question,
                 answer=response.content,
@@ -870,11 +948,19 @@ async def startup_event():
                 llm_available=llm_manager is not None,
                 default_model=llm_manager.default_model if llm_manager else None,
                 openai_configured=bool(os.getenv("OPENAI_API_KEY")))
+    try:
+        get_semantic_cache().load(SEMANTIC_CACHE_PATH)
+    except Exception as e:
+        logger.warning("Failed to load semantic cache", path=SEMANTIC_CACHE_PATH, error=str(e))
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Log application shutdown"""
+    """Log application shutdown and persist the semantic cache"""
     logger.info("APISage Backend API shutting down")
+    try:
+        get_semantic_cache().save(SEMANTIC_CACHE_PATH)
+    except Exception as e:
+        logger.warning("Failed to save semantic cache", path=SEMANTIC_CACHE_PATH, error=str(e))
 
 if __name__ == "__main__":
     import uvicorn
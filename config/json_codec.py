@@ -0,0 +1,34 @@
+"""
+JSON encoding helpers shared by the Gradio frontends
+Uses orjson when it is installed and falls back to the standard json module
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def json_loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+    """Parse JSON from str or bytes, using orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)  # type: ignore[arg-type]
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """Serialize to JSON bytes, using orjson when available.
+
+    YAML specs load unquoted status codes (``200:``) as int keys; those are
+    stringified like ``json.dumps`` does instead of being rejected.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode("utf-8")
@@ -7,11 +7,16 @@ Provides a user-friendly web interface for comprehensive API documentation analy
 import json
 import logging
 import os
+import threading
 import time
+from functools import lru_cache
 from typing import Any, Dict, Optional, Tuple
 
 import gradio as gr
 import requests
+from requests.adapters import HTTPAdapter
+
+from config.json_codec import JSON_HEADERS, json_dumps_bytes, json_loads
 
 # Configure logging
 logging.basicConfig(
@@ -27,6 +32,27 @@ TIMEOUT_HEALTH = int(os.getenv("TIMEOUT_HEALTH", "30"))
 TIMEOUT_API_KEY = int(os.getenv("TIMEOUT_API_KEY", "60"))
 TIMEOUT_ANALYSIS = int(os.getenv("TIMEOUT_ANALYSIS", "600"))
 
+# Shared HTTP session, created on first use so importing this module stays cheap
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the pooled keep-alive session used for all APISage server calls"""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(
+                    {"Connection": "keep-alive", "Accept-Encoding": "gzip"}
+                )
+                _SESSION = session
+    return _SESSION
+
 
 def validate_openapi_spec(content: str) -> Tuple[bool, str]:
     """Validate OpenAPI specification format and structure"""
@@ -42,7 +68,7 @@ def validate_openapi_spec(content: str) -> Tuple[bool, str]:
             )
 
         # Parse JSON
-        spec_data = json.loads(content)
+        spec_data = json_loads(content)
 
         # Basic OpenAPI validation
         if not isinstance(spec_data, dict):
@@ -65,10 +91,19 @@ def validate_openapi_spec(content: str) -> Tuple[bool, str]:
         return False, f"Validation error: {str(e)}"
 
 
+HEALTH_CACHE_SECONDS = 5
+
+
 def check_server_health() -> Tuple[bool, str]:
-    """Check if the APISage server is running"""
+    """Check if the APISage server is running, reusing results for a few seconds"""
+    return _check_server_health_cached(int(time.time() // HEALTH_CACHE_SECONDS))
+
+
+@lru_cache(maxsize=4)
+def _check_server_health_cached(bucket: int) -> Tuple[bool, str]:
+    """Perform the health check; cached per time bucket"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=TIMEOUT_HEALTH)
+        response = get_session().get(f"{API_BASE_URL}/health", timeout=TIMEOUT_HEALTH)
         if response.status_code == 200:
             return True, "✅ APISage server is running and healthy"
         else:
@@ -89,14 +124,15 @@ def set_openai_api_key(api_key: str) -> str:
         return "⚠️ Invalid API key format. OpenAI API keys should start with 'sk-'"
 
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/set-api-key",
-            json={"api_key": api_key},
+            data=json_dumps_bytes({"api_key": api_key}),
+            headers=JSON_HEADERS,
             timeout=TIMEOUT_API_KEY,
         )
 
         if response.status_code == 200:
-            result = response.json()
+            result = json_loads(response.content)
             if result.get("status") == "success":
                 logger.info("OpenAI API key set successfully")
                 return "✅ OpenAI API key set successfully! Enhanced analysis is now available."
@@ -131,6 +167,8 @@ def analyze_openapi_spec(spec_content: str) -> Tuple[str, str, str, str]:
             "/analyze/detailed",  # Most comprehensive
             "/analyze",  # Basic analysis
         ]
+        # Encoded once and reused if the first endpoint fails
+        request_body = json_dumps_bytes({"content": spec_content.strip()})
 
         analysis_result = None
         endpoint_used = None
@@ -138,16 +176,17 @@ def analyze_openapi_spec(spec_content: str) -> Tuple[str, str, str, str]:
         for endpoint in analysis_endpoints:
             try:
                 logger.info(f"Trying endpoint: {endpoint}")
-                response = requests.post(
+                response = get_session().post(
                     f"{API_BASE_URL}{endpoint}",
-                    json={"content": spec_content.strip()},
+                    data=request_body,
+                    headers=JSON_HEADERS,
                     timeout=TIMEOUT_ANALYSIS,
                 )
 
                 logger.info(f"Response status: {response.status_code}")
 
                 if response.status_code == 200:
-                    result = response.json()
+                    result = json_loads(response.content)
                     logger.info(
                         f"Response keys: {list(result.keys()) if isinstance(result, dict) else 'Not a dict'}"
                     )
@@ -488,9 +527,9 @@ def format_detailed_analysis_results(
 def get_server_logs() -> str:
     """Get server logs from the running server"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=TIMEOUT_HEALTH)
+        response = get_session().get(f"{API_BASE_URL}/health", timeout=TIMEOUT_HEALTH)
         if response.status_code == 200:
-            health_data = response.json()
+            health_data = json_loads(response.content)
 
             logs_info = f"""# 📋 Server Status & Logs
 
@@ -534,14 +573,15 @@ def get_analysis_logs() -> str:
     try:
         test_spec = '{"openapi": "3.0.0", "info": {"title": "Test", "version": "1.0.0"}, "paths": {"/test": {"get": {"responses": {"200": {"description": "OK"}}}}}}'
 
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/analyze",
-            json={"content": test_spec},
+            data=json_dumps_bytes({"content": test_spec}),
+            headers=JSON_HEADERS,
             timeout=TIMEOUT_ANALYSIS,
         )
 
         if response.status_code == 200:
-            result = response.json()
+            result = json_loads(response.content)
             analysis = result.get("result", result.get("analysis", result))
 
             log_info = "# 🔍 Analysis Logs\n\n"
@@ -779,6 +819,10 @@ def create_gradio_interface():
             is_healthy, message = check_server_health()
             return message
 
+        def on_refresh_server():
+            _check_server_health_cached.cache_clear()
+            return on_check_server()
+
         def on_set_api_key(api_key):
             return set_openai_api_key(api_key)
 
@@ -798,7 +842,7 @@ def create_gradio_interface():
             return get_analysis_logs()
 
         # Connect event handlers
-        check_btn.click(fn=on_check_server, outputs=[server_status])
+        check_btn.click(fn=on_refresh_server, outputs=[server_status])
 
         set_key_btn.click(
             fn=on_set_api_key, inputs=[api_key_input], outputs=[api_key_status]
@@ -844,8 +888,20 @@ def main():
     print("🎯 Starting APISage Enhanced Analysis - Gradio Interface (FIXED)")
     print("=" * 60)
 
-    # Check if server is running
-    is_healthy, message = check_server_health()
+    # Check server health in the background while the interface is built
+    health_result = {}
+    health_thread = threading.Thread(
+        target=lambda: health_result.update(status=check_server_health()),
+        daemon=True,
+    )
+    health_thread.start()
+
+    app = create_gradio_interface()
+
+    health_thread.join()
+    is_healthy, message = health_result.get(
+        "status", (False, "❌ Server health check did not complete")
+    )
     if not is_healthy:
         print(f"\n⚠️  Warning: {message}")
         print("\nPlease make sure the APISage server is running:")
@@ -857,9 +913,7 @@ def main():
         print(f"\n✅ {message}")
         print(f"🌐 Starting Gradio interface on http://localhost:{GRADIO_PORT}")
 
-    # Create and launch the interface
-    app = create_gradio_interface()
-
+    # Launch the interface
     try:
         app.launch(
             server_name="0.0.0.0",
@@ -7,29 +7,110 @@ import gradio as gr
 import json
 import yaml
 import os
+import mmap
 import httpx
 import asyncio
 import logging
+import logging.handlers
+import queue
+import atexit
 import sys
 import re
-from datetime import datetime
+import time
 from typing import Dict, Any, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('apisage_complete.log')
-    ]
+from config.json_codec import (
+    JSON_HEADERS,
+    ORJSON_AVAILABLE,
+    json_dumps_bytes,
+    json_loads,
 )
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Configure logging: handlers write from a background listener thread so
+# request handlers only enqueue records instead of blocking on stdout/disk
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('apisage_complete.log', delay=True)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
+def _load_json_file(path):
+    """Parse a JSON file, memory-mapping it so orjson parses without an extra copy"""
+    with open(path, 'rb') as f:
+        if not ORJSON_AVAILABLE or os.fstat(f.fileno()).st_size == 0:
+            return json_loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return json_loads(view)
+            finally:
+                view.release()
+
 # Global state
 current_spec = None
 
+# Derived data for the currently loaded spec, keyed by id(current_spec).
+# Spec dicts cannot be weakly referenced, so entries are evicted whenever
+# a new spec replaces the current one.
+_spec_cache = {}
+
+def _set_current_spec(spec):
+    """Replace the loaded spec and drop caches derived from the previous one"""
+    global current_spec
+    current_spec = spec
+    _spec_cache.clear()
+    _spec_cache[id(spec)] = {}
+    return spec
+
+ANALYSIS_FOCUS_AREAS = ["security", "performance", "documentation", "completeness", "standards"]
+
+def _spec_request_body(**fields):
+    """Build a JSON request body embedding the current spec, serialized once per spec"""
+    cache = _get_spec_cache()
+    spec_bytes = cache.get('spec_json')
+    if spec_bytes is None:
+        spec_bytes = cache['spec_json'] = json_dumps_bytes(current_spec)
+    if not fields:
+        return b''.join([b'{"openapi_spec":', spec_bytes, b'}'])
+    # Splice the cached spec in after the other fields' closing brace is dropped
+    return b''.join([json_dumps_bytes(fields)[:-1], b',"openapi_spec":', spec_bytes, b'}'])
+
+# Backend HTTP client shared by all handlers so clicks reuse pooled keep-alive
+# connections; created lazily because it must be built on Gradio's event loop
+_http_client: Optional[httpx.AsyncClient] = None
+
+def _get_http_client():
+    """Return the pooled client used for all backend calls"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=8)
+        )
+    return _http_client
+
+# (path, size, mtime) of the last uploaded file with its parsed spec and outputs
+_last_upload = None
+
+def _get_spec_cache():
+    """Return the auxiliary cache for the currently loaded spec"""
+    return _spec_cache.setdefault(id(current_spec), {})
+
 # Dark theme CSS with optimized spacing
 CUSTOM_CSS = """
 .gradio-container {
@@ -100,10 +181,175 @@ CUSTOM_CSS = """
 }
 """
 
+# Static HTML blocks for the interface, built once at import time
+HERO_HTML = """
+<div class="hero-section">
+    <div class="hero-title">🚀 APISage Complete</div>
+    <div class="hero-subtitle">Stage 1: API Analysis & Evaluation • Stage 2: RAG Assistant</div>
+</div>
+"""
+
+RAG_TRIAD_INFO_HTML = """
+<div style="margin-top: 20px; padding: 15px; background: rgba(100, 116, 139, 0.1); border-radius: 8px; border-left: 4px solid #64748b;">
+    <h4 style="margin: 0 0 10px 0; color: #64748b;">🧪 Educational: Understanding RAG Evaluation</h4>
+    <p style="margin: 0 0 10px 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
+        <strong>What is RAG Triad?</strong><br>
+        A comprehensive evaluation framework that measures three critical aspects of AI-generated responses:
+    </p>
+    <ul style="margin: 0; padding-left: 20px; font-size: 0.85rem; color: #94a3b8; line-height: 1.6;">
+        <li><strong>🎯 Answer Relevancy:</strong> Semantic similarity between question and answer using cosine similarity of embeddings</li>
+        <li><strong>🔍 Faithfulness:</strong> Percentage of claims in the answer that can be verified from source documents</li>
+        <li><strong>📋 Context Relevancy:</strong> Ratio of relevant vs. irrelevant chunks in retrieved documentation</li>
+    </ul>
+    <p style="margin: 10px 0 0 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
+        <strong>How Overall Score is Calculated:</strong><br>
+        <code style="background: rgba(0,0,0,0.2); padding: 2px 4px; border-radius: 3px;">
+        Overall = (0.4 × Answer Relevancy) + (0.4 × Faithfulness) + (0.2 × Context Relevancy)
+        </code><br>
+        <em style="font-size: 0.8rem;">Higher weights on answer quality, lower on retrieval quality</em>
+    </p>
+    <p style="margin: 10px 0 0 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
+        <strong>Why This Matters:</strong><br>
+        • Transparency: See exactly how AI responses are evaluated<br>
+        • Trust: Understand the reliability of each answer<br>
+        • Learning: Improve your questions based on scoring feedback
+    </p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div style="text-align: center; margin-top: 1rem; opacity: 0.7; font-size: 0.9rem;">
+    <p>🔗 <a href="http://localhost:8080/docs" target="_blank">API Docs</a> • 
+    📍 Upload spec → Analyze → Ask questions</p>
+</div>
+"""
+
+# Static explanation text for the RAG Triad evaluation display
+RAG_EVAL_HEADER = "\n\n📊 **DeepEval RAG Triad Evaluation Results:**\n" + "=" * 60 + "\n\n"
+
+ANSWER_RELEVANCY_INFO = (
+    "**What it measures:** How well the answer addresses your specific question\n"
+    "**Formula:** `Cosine Similarity(Question Embedding, Answer Embedding)`\n"
+    "**Interpretation:** "
+)
+
+FAITHFULNESS_INFO = (
+    "**What it measures:** Accuracy of the answer relative to source documents\n"
+    "**Formula:** `(Verified Claims / Total Claims)` where claims are validated against context\n"
+    "**Interpretation:** "
+)
+
+CONTEXTUAL_RELEVANCY_INFO = (
+    "**What it measures:** Quality of retrieved documentation chunks\n"
+    "**Formula:** `(Relevant Chunks / Total Retrieved Chunks)`\n"
+    "**Interpretation:** "
+)
+
+OVERALL_SCORE_INFO = (
+    "**Calculation:** Weighted average of all metrics\n"
+    "**Formula:** `(0.4 × Answer Relevancy + 0.4 × Faithfulness + 0.2 × Context Relevancy)`\n"
+)
+
+CONFIDENCE_INFO = (
+    "**What it measures:** System's confidence in the evaluation\n"
+    "**Formula:** `min(1.0, Overall Score × Context Quality Factor × Response Coherence)`\n"
+    "**Interpretation:** "
+)
+
+QUALITY_ASSESSMENT_HEADER = "\n" + "=" * 60 + "\n## 📈 **Quality Assessment**\n"
+
+TIPS_HEADER = "\n### 💡 **Tips for Better Results:**\n"
+
+# Per-metric sections of the RAG Triad display: (key, heading, info,
+# [(minimum score, interpretation), ...], interpretation below every minimum)
+RAG_METRIC_SECTIONS = [
+    ('answer_relevancy', "🎯 **Answer Relevancy", ANSWER_RELEVANCY_INFO, [
+        (0.8, "✅ Excellent - Answer directly addresses the question"),
+        (0.6, "✔️ Good - Answer is mostly relevant with minor deviations"),
+        (0.4, "⚠️ Fair - Answer partially addresses the question"),
+    ], "❌ Poor - Answer may be off-topic or incomplete"),
+    ('faithfulness', "🔍 **Faithfulness", FAITHFULNESS_INFO, [
+        (0.9, "✅ Excellent - All claims are supported by documentation"),
+        (0.7, "✔️ Good - Most claims are accurate with minor issues"),
+        (0.5, "⚠️ Fair - Some claims lack proper support"),
+    ], "❌ Poor - Answer contains unsupported or incorrect claims"),
+    ('contextual_relevancy', "📋 **Contextual Relevancy", CONTEXTUAL_RELEVANCY_INFO, [
+        (0.8, "✅ Excellent - Retrieved highly relevant documentation"),
+        (0.6, "✔️ Good - Most retrieved content is useful"),
+        (0.4, "⚠️ Fair - Mixed relevance in retrieved content"),
+    ], "❌ Poor - Retrieved content has low relevance"),
+]
+
+CONFIDENCE_SECTION = ('confidence', "🎲 **Confidence", CONFIDENCE_INFO, [
+    (0.8, "✅ High confidence - Reliable evaluation"),
+    (0.6, "✔️ Moderate confidence - Generally trustworthy"),
+    (0.4, "⚠️ Low confidence - Results may vary"),
+], "❌ Very low confidence - Evaluation uncertain")
+
+# Overall quality tiers: (minimum score, heading, meaning, advice)
+QUALITY_TIERS = [
+    (0.8, "✅ **Excellent Quality**",
+     "**What this means:** The AI has provided a highly accurate, relevant, and well-supported answer.\n",
+     "**You can:** Trust this response with high confidence for critical decisions.\n"),
+    (0.6, "✔️ **Good Quality**",
+     "**What this means:** The answer is generally reliable with minor areas for improvement.\n",
+     "**You can:** Use this response confidently, but verify critical details.\n"),
+    (0.4, "⚠️ **Fair Quality**",
+     "**What this means:** The answer has some useful information but may lack completeness or accuracy.\n",
+     "**You should:** Cross-reference important information and ask follow-up questions.\n"),
+]
+
+QUALITY_FALLBACK_TIER = (
+    None, "❌ **Needs Improvement**",
+    "**What this means:** The answer may be off-topic, incomplete, or contain inaccuracies.\n",
+    "**You should:** Rephrase your question or provide more context for better results.\n",
+)
+
+def _summarize_paths(paths):
+    """Render endpoint lines for the API info panel, returning (lines, method_count)"""
+    lines = []
+    methods_found = 0
+    for path, methods in paths.items():
+        lines.append(f"\n**`{path}`**\n")
+        if isinstance(methods, dict):
+            for method, details in methods.items():
+                methods_found += 1
+                if isinstance(details, dict):
+                    summary = details.get('summary', details.get('description', 'No summary'))
+                    lines.append(f"- **{method.upper()}** - {summary}\n")
+    return lines, methods_found
+
+def _summarize_contact(info):
+    """Render the OpenAPI contact section for the API info panel"""
+    contact = info.get('contact')
+    if contact is None:
+        return []
+    lines = ["\n### 📧 **Contact Information**\n"]
+    if contact.get('name'):
+        lines.append(f"**Name**: {contact['name']}\n")
+    if contact.get('email'):
+        lines.append(f"**Email**: {contact['email']}\n")
+    if contact.get('url'):
+        lines.append(f"**URL**: {contact['url']}\n")
+    return lines
+
+def _summarize_custom_extras(spec):
+    """Render authentication and rate limiting sections for custom-format specs"""
+    lines = []
+    auth_info = spec.get('authentication')
+    if auth_info:
+        lines.append("\n### 🔐 **Authentication**\n")
+        lines.append(f"**Type**: {auth_info.get('type', 'Not specified')}\n")
+        if auth_info.get('description'):
+            lines.append(f"**Details**: {auth_info['description']}\n")
+    if spec.get('rate_limiting'):
+        lines.append("\n### ⚡ **Rate Limiting**\n")
+        lines.append(f"{spec['rate_limiting']}\n")
+    return lines
+
 def load_api_spec(file):
     """Load and parse API specification with logging"""
-    global current_spec
-    
+    global _last_upload
     logger.info(f"File upload attempt: {file.name if file else 'No file'}")
     
     if not file:
@@ -111,23 +357,29 @@ def load_api_spec(file):
         return None, "Upload an API specification to get started", ""
     
     try:
-        logger.info(f"Reading file: {file.name}, size: {os.path.getsize(file.name)} bytes")
+        stat = os.stat(file.name)
+        upload_key = (file.name, stat.st_size, stat.st_mtime_ns)
+        logger.info(f"Reading file: {file.name}, size: {stat.st_size} bytes")
         
-        with open(file.name, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        logger.info(f"File content length: {len(content)} characters")
+        # Repeated change events for an unchanged file reuse the previous result
+        if _last_upload and _last_upload[0] == upload_key:
+            logger.info("Specification unchanged since last load, reusing parsed result")
+            cached_spec, outputs = _last_upload[1], _last_upload[2]
+            if current_spec is not cached_spec:
+                _set_current_spec(cached_spec)
+            return outputs
         
         if file.name.endswith(('.yaml', '.yml')):
             logger.info("Parsing as YAML file")
-            spec = yaml.safe_load(content)
+            with open(file.name, 'rb') as f:
+                spec = yaml.load(f.read(), Loader=YAML_LOADER)
         else:
             logger.info("Parsing as JSON file")
-            spec = json.loads(content)
+            spec = _load_json_file(file.name)
         
         logger.info(f"Parsed specification keys: {list(spec.keys()) if isinstance(spec, dict) else 'Not a dict'}")
         
-        current_spec = spec
+        _set_current_spec(spec)
         
         # Handle both OpenAPI 3.0 format and custom format
         if 'openapi' in spec or 'swagger' in spec:
@@ -174,48 +426,21 @@ def load_api_spec(file):
 ### 🎯 **Available Endpoints** ({endpoint_count} total)
 """
         
-        # Add endpoint details
-        methods_found = 0
-        for path, methods in paths.items():
-            api_info += f"\n**`{path}`**\n"
-            if isinstance(methods, dict):
-                for method, details in methods.items():
-                    methods_found += 1
-                    if isinstance(details, dict):
-                        summary = details.get('summary', details.get('description', 'No summary'))
-                        api_info += f"- **{method.upper()}** - {summary}\n"
-        
+        # Build the remaining sections in one pass each, joined once at the end
+        endpoint_lines, methods_found = _summarize_paths(paths)
         logger.info(f"Processed {methods_found} HTTP methods across {endpoint_count} endpoints")
         
-        # Add additional info for both formats
         if 'openapi' in spec or 'swagger' in spec:
-            # OpenAPI format contact info
-            spec_info = spec.get('info', {})
-            if 'contact' in spec_info:
-                contact = spec_info['contact']
-                api_info += f"\n### 📧 **Contact Information**\n"
-                if contact.get('name'):
-                    api_info += f"**Name**: {contact['name']}\n"
-                if contact.get('email'):
-                    api_info += f"**Email**: {contact['email']}\n"
-                if contact.get('url'):
-                    api_info += f"**URL**: {contact['url']}\n"
+            extra_lines = _summarize_contact(spec.get('info', {}))
         else:
-            # Custom format additional info
-            if spec.get('authentication'):
-                auth_info = spec['authentication']
-                api_info += f"\n### 🔐 **Authentication**\n"
-                api_info += f"**Type**: {auth_info.get('type', 'Not specified')}\n"
-                if auth_info.get('description'):
-                    api_info += f"**Details**: {auth_info['description']}\n"
-            
-            if spec.get('rate_limiting'):
-                api_info += f"\n### ⚡ **Rate Limiting**\n"
-                api_info += f"{spec['rate_limiting']}\n"
+            extra_lines = _summarize_custom_extras(spec)
+        
+        api_info = "".join([api_info, *endpoint_lines, *extra_lines])
         
         spec_json = json.dumps(spec, indent=2)
         status = "✅ API specification loaded successfully"
         
+        _last_upload = (upload_key, current_spec, (spec_json, api_info, status))
         return spec_json, api_info, status
         
     except Exception as e:
@@ -224,8 +449,6 @@ def load_api_spec(file):
 
 def load_demo():
     """Load demo Pet Store API with logging"""
-    global current_spec
-    
     logger.info("Loading Pet Store demo API specification")
     
     demo_spec = {
@@ -248,7 +471,7 @@ def load_demo():
         }
     }
     
-    current_spec = demo_spec
+    _set_current_spec(demo_spec)
     
     # Log demo spec details
     demo_endpoints = len(demo_spec.get('paths', {}))
@@ -287,42 +510,48 @@ async def set_api_key(api_key):
     
     try:
         logger.info("Setting OpenAI API key in backend")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8080/set-api-key",
-                json={"api_key": api_key},
-                timeout=10.0
-            )
+        response = await _get_http_client().post(
+            "http://localhost:8080/set-api-key",
+            content=json_dumps_bytes({"api_key": api_key}),
+            headers=JSON_HEADERS,
+            timeout=10.0
+        )
+        
+        if response.status_code == 200:
+            logger.info("API key set successfully")
+            return "✅ API key set successfully - Ready for analysis"
+        else:
+            error_msg = f"Failed to set API key (Status: {response.status_code})"
+            logger.error(error_msg)
+            return f"❌ {error_msg}"
             
-            if response.status_code == 200:
-                logger.info("API key set successfully")
-                return "✅ API key set successfully - Ready for analysis"
-            else:
-                error_msg = f"Failed to set API key (Status: {response.status_code})"
-                logger.error(error_msg)
-                return f"❌ {error_msg}"
-                
     except Exception as e:
         error_msg = f"Error setting API key: {str(e)}"
         logger.error(error_msg)
         return f"❌ {error_msg}"
 
-def enhance_analysis_formatting(content):
-    """Enhance the visual formatting of API analysis results"""
-    if not content or len(content.strip()) < 10:
-        return content
-    
-    # Enhanced formatting patterns
-    enhanced_content = content
-    
-    # 1. Format Overall Score with visual progress bar
-    overall_score_pattern = r'\*\*Overall Score:\*\* (\d+)/100'
-    def format_overall_score(match):
-        score = int(match.group(1))
-        # Create visual progress bar
-        progress_bars = "🟩" * (score // 10) + "🟨" * ((100-score) // 20) + "⬜" * max(0, 10 - (score // 10) - ((100-score) // 20))
-        color = "🟢" if score >= 80 else "🟡" if score >= 60 else "🔴"
-        return f"""
+# Score extraction patterns for the analysis formatter, compiled once
+OVERALL_SCORE_RE = re.compile(r'\*\*Overall Score:\*\* (\d+)/100')
+
+# Bulleted (-, •, ◦) score lines in one pass, then plain "Category: N/100" lines
+SCORE_LINE_RES = [
+    re.compile(r'[-•◦] \*\*(\w+):\*\* (\d+)/100 - ([^\n]+)'),
+    re.compile(r'(\w+): (\d+)/100 - ([^\n]+)'),
+]
+
+SCORE_ICONS = {
+    "Completeness": "🔧", "Documentation": "📚", "Security": "🔒", 
+    "Usability": "👥", "Standards": "📏", "Performance": "⚡",
+    "Compliance": "📏"  # For "Standards Compliance"
+}
+
+def _format_overall_score(match):
+    """Render the overall score as a card with a progress bar"""
+    score = int(match.group(1))
+    # Create visual progress bar
+    progress_bars = "🟩" * (score // 10) + "🟨" * ((100-score) // 20) + "⬜" * max(0, 10 - (score // 10) - ((100-score) // 20))
+    color = "🟢" if score >= 80 else "🟡" if score >= 60 else "🔴"
+    return f"""
 ## 📊 **Overall API Quality Score**
 
 <div style="background: linear-gradient(135deg, #1e293b 0%, #334155 100%); padding: 20px; border-radius: 12px; margin: 15px 0; border-left: 4px solid #3b82f6;">
@@ -338,48 +567,33 @@ def enhance_analysis_formatting(content):
     </div>
 </div>
 """
+
+def _format_score_line(category, score, description):
+    """Render a single category score as a colour-coded card"""
+    icon = SCORE_ICONS.get(category, "📊")
     
-    enhanced_content = re.sub(overall_score_pattern, format_overall_score, enhanced_content)
+    # Color coding based on score
+    if score >= 80:
+        color = "#10b981"  # Green
+        bg_color = "rgba(16, 185, 129, 0.1)"
+        status = "🟢"
+    elif score >= 60:
+        color = "#f59e0b"  # Yellow
+        bg_color = "rgba(245, 158, 11, 0.1)"
+        status = "🟡"
+    elif score >= 40:
+        color = "#f97316"  # Orange  
+        bg_color = "rgba(249, 115, 22, 0.1)"
+        status = "🟠"
+    else:
+        color = "#ef4444"  # Red
+        bg_color = "rgba(239, 68, 68, 0.1)"
+        status = "🔴"
     
-    # 2. Format individual score breakdowns with icons and colors
-    score_patterns = {
-        r'- \*\*(\w+):\*\* (\d+)/100 - ([^\n]+)': lambda m: format_score_line(m.group(1), int(m.group(2)), m.group(3)),
-        r'• \*\*(\w+):\*\* (\d+)/100 - ([^\n]+)': lambda m: format_score_line(m.group(1), int(m.group(2)), m.group(3)),
-        r'◦ \*\*(\w+):\*\* (\d+)/100 - ([^\n]+)': lambda m: format_score_line(m.group(1), int(m.group(2)), m.group(3)),
-        r'(\w+): (\d+)/100 - ([^\n]+)': lambda m: format_score_line(m.group(1), int(m.group(2)), m.group(3)),
-    }
+    # Create mini progress bar
+    progress = "█" * (score // 10) + "░" * (10 - score // 10)
     
-    def format_score_line(category, score, description):
-        icons = {
-            "Completeness": "🔧", "Documentation": "📚", "Security": "🔒", 
-            "Usability": "👥", "Standards": "📏", "Performance": "⚡",
-            "Compliance": "📏"  # For "Standards Compliance"
-        }
-        
-        icon = icons.get(category, "📊")
-        
-        # Color coding based on score
-        if score >= 80:
-            color = "#10b981"  # Green
-            bg_color = "rgba(16, 185, 129, 0.1)"
-            status = "🟢"
-        elif score >= 60:
-            color = "#f59e0b"  # Yellow
-            bg_color = "rgba(245, 158, 11, 0.1)"
-            status = "🟡"
-        elif score >= 40:
-            color = "#f97316"  # Orange  
-            bg_color = "rgba(249, 115, 22, 0.1)"
-            status = "🟠"
-        else:
-            color = "#ef4444"  # Red
-            bg_color = "rgba(239, 68, 68, 0.1)"
-            status = "🔴"
-        
-        # Create mini progress bar
-        progress = "█" * (score // 10) + "░" * (10 - score // 10)
-        
-        return f"""
+    return f"""
 <div style="background: {bg_color}; border: 1px solid {color}; border-radius: 8px; padding: 12px; margin: 8px 0;">
     <div style="display: flex; align-items: center; justify-content: space-between;">
         <div style="display: flex; align-items: center; gap: 10px;">
@@ -396,220 +610,305 @@ def enhance_analysis_formatting(content):
     </div>
 </div>
 """
+
+def _format_score_match(match):
+    return _format_score_line(match.group(1), int(match.group(2)), match.group(3))
+
+# Markdown-to-HTML patterns for the analysis formatter, compiled once
+ISSUE_ITEM_RE = re.compile(r'^(\d+\.\s+\*\*Issue:\*\*\s+.+)$', re.MULTILINE)
+SUB_BULLET_RE = re.compile(r'^(\s*-\s+\*\*[^*]+:\*\*\s+.+)$', re.MULTILINE)
+BOLD_LABEL_RE = re.compile(r'\*\*([^*]+):\*\*')
+BOLD_RE = re.compile(r'\*\*([^*]+)\*\*')
+EXECUTIVE_SUMMARY_RE = re.compile(r'### (🎯 Executive Summary)')
+CRITICAL_ISSUES_RE = re.compile(r'### (🚨 Critical Issues \(Priority Order\))')
+SECTION_HEADER_RES = [
+    (re.compile(r'### (.+)'), r'<h3 style="background: linear-gradient(45deg, #3b82f6, #8b5cf6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; background-clip: text; color: #3b82f6; font-size: 1.3em; margin: 20px 0 10px 0; font-weight: bold;">\1</h3>'),
+    (re.compile(r'## (.+)'), r'<h2 style="background: linear-gradient(45deg, #06b6d4, #3b82f6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; background-clip: text; color: #06b6d4; font-size: 1.5em; margin: 25px 0 15px 0; padding-bottom: 8px; border-bottom: 2px solid #334155; font-weight: bold;">\1</h2>'),
+]
+CODE_BLOCK_RE = re.compile(r'```(yaml|json|javascript|python)?\n(.*?)\n```', re.DOTALL)
+NUMBERED_ITEM_RE = re.compile(r'^(\d+\. .+)$', re.MULTILINE)
+BULLET_ITEM_RE = re.compile(r'^- (.+)$', re.MULTILINE)
+
+def _format_issue_item(match):
+    """Render a numbered critical issue as a highlighted block"""
+    issue_text = match.group(1)
+    # Apply markdown formatting to the issue text
+    formatted_text = BOLD_LABEL_RE.sub(r'<strong style="color: #dc2626;">\1:</strong>', issue_text)
+    formatted_text = BOLD_RE.sub(r'<strong>\1</strong>', formatted_text)
+    return f'<div style="background: linear-gradient(135deg, rgba(239, 68, 68, 0.1), rgba(220, 38, 38, 0.05)); border-left: 4px solid #dc2626; padding: 12px; margin: 10px 0; border-radius: 0 8px 8px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">{formatted_text}</div>'
+
+def _format_sub_bullet(match):
+    """Render a labelled sub-bullet (e.g. - **Location:**) as an indented block"""
+    bullet_text = match.group(1)
+    # Apply markdown formatting to sub-bullet text
+    formatted_text = BOLD_LABEL_RE.sub(r'<strong style="color: #64748b;">\1:</strong>', bullet_text)
+    formatted_text = BOLD_RE.sub(r'<strong>\1</strong>', formatted_text)
+    return f'<div style="background: rgba(100, 116, 139, 0.05); border-left: 2px solid #64748b; padding: 8px; margin: 5px 0 5px 20px; border-radius: 0 4px 4px 0;">{formatted_text}</div>'
+
+def enhance_analysis_formatting(content):
+    """Enhance the visual formatting of API analysis results"""
+    if not content or len(content.strip()) < 10:
+        return content
     
-    for pattern, formatter in score_patterns.items():
-        enhanced_content = re.sub(pattern, formatter, enhanced_content)
+    # Enhanced formatting patterns
+    enhanced_content = content
+    
+    # 1. Format Overall Score with visual progress bar
+    enhanced_content = OVERALL_SCORE_RE.sub(_format_overall_score, enhanced_content)
+    
+    # 2. Format individual score breakdowns with icons and colors
+    for pattern in SCORE_LINE_RES:
+        enhanced_content = pattern.sub(_format_score_match, enhanced_content)
     
     # 2.5. Format Critical Issues section content specifically
     # This needs to happen BEFORE general markdown formatting
-    def format_critical_issues_content(content):
-        # Format numbered issues with proper styling
-        issue_pattern = r'^(\d+\.\s+\*\*Issue:\*\*\s+.+)$'
-        def format_issue_item(match):
-            issue_text = match.group(1)
-            # Apply markdown formatting to the issue text
-            formatted_text = re.sub(r'\*\*([^*]+):\*\*', r'<strong style="color: #dc2626;">\1:</strong>', issue_text)
-            formatted_text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', formatted_text)
-            return f'<div style="background: linear-gradient(135deg, rgba(239, 68, 68, 0.1), rgba(220, 38, 38, 0.05)); border-left: 4px solid #dc2626; padding: 12px; margin: 10px 0; border-radius: 0 8px 8px 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">{formatted_text}</div>'
-        
-        content = re.sub(issue_pattern, format_issue_item, content, flags=re.MULTILINE)
-        
-        # Format sub-bullets with indentation and styling (- **Location:** patterns)
-        sub_bullet_pattern = r'^(\s*-\s+\*\*[^*]+:\*\*\s+.+)$'
-        def format_sub_bullet(match):
-            bullet_text = match.group(1)
-            # Apply markdown formatting to sub-bullet text
-            formatted_text = re.sub(r'\*\*([^*]+):\*\*', r'<strong style="color: #64748b;">\1:</strong>', bullet_text)
-            formatted_text = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', formatted_text)
-            return f'<div style="background: rgba(100, 116, 139, 0.05); border-left: 2px solid #64748b; padding: 8px; margin: 5px 0 5px 20px; border-radius: 0 4px 4px 0;">{formatted_text}</div>'
-        
-        content = re.sub(sub_bullet_pattern, format_sub_bullet, content, flags=re.MULTILINE)
-        
-        return content
-    
-    enhanced_content = format_critical_issues_content(enhanced_content)
+    enhanced_content = ISSUE_ITEM_RE.sub(_format_issue_item, enhanced_content)
+    enhanced_content = SUB_BULLET_RE.sub(_format_sub_bullet, enhanced_content)
     
     # Now handle remaining markdown formatting for other sections
     # Handle **Issue:** patterns that weren't caught above
-    enhanced_content = re.sub(r'\*\*([^*]+):\*\*', r'<strong style="color: #3b82f6;">\1:</strong>', enhanced_content)
+    enhanced_content = BOLD_LABEL_RE.sub(r'<strong style="color: #3b82f6;">\1:</strong>', enhanced_content)
     
     # Handle general bold text **text** patterns
-    enhanced_content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', enhanced_content)
+    enhanced_content = BOLD_RE.sub(r'<strong>\1</strong>', enhanced_content)
     
     # 3. Format special sections first (before general headers)
-    # Executive Summary
-    executive_pattern = r'### (🎯 Executive Summary)'
-    enhanced_content = re.sub(executive_pattern,
+    enhanced_content = EXECUTIVE_SUMMARY_RE.sub(
         r'<div style="background: linear-gradient(135deg, #059669, #10b981); padding: 15px; border-radius: 10px; margin: 20px 0;"><h3 style="color: white; margin: 0; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">\1</h3></div>',
         enhanced_content)
-    
-    # Critical Issues
-    critical_issues_pattern = r'### (🚨 Critical Issues \(Priority Order\))'
-    enhanced_content = re.sub(critical_issues_pattern, 
-        r'<div style="background: linear-gradient(135deg, #dc2626, #ef4444); padding: 15px; border-radius: 10px; margin: 20px 0;"><h3 style="color: white; margin: 0; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">\1</h3></div>', 
+    enhanced_content = CRITICAL_ISSUES_RE.sub(
+        r'<div style="background: linear-gradient(135deg, #dc2626, #ef4444); padding: 15px; border-radius: 10px; margin: 20px 0;"><h3 style="color: white; margin: 0; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">\1</h3></div>',
         enhanced_content)
     
     # 4. Format remaining section headers with better styling
-    section_patterns = {
-        r'### (.+)': r'<h3 style="background: linear-gradient(45deg, #3b82f6, #8b5cf6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; background-clip: text; color: #3b82f6; font-size: 1.3em; margin: 20px 0 10px 0; font-weight: bold;">\1</h3>',
-        r'## (.+)': r'<h2 style="background: linear-gradient(45deg, #06b6d4, #3b82f6); -webkit-background-clip: text; -webkit-text-fill-color: transparent; background-clip: text; color: #06b6d4; font-size: 1.5em; margin: 25px 0 15px 0; padding-bottom: 8px; border-bottom: 2px solid #334155; font-weight: bold;">\1</h2>',
-    }
-    
-    for pattern, replacement in section_patterns.items():
-        enhanced_content = re.sub(pattern, replacement, enhanced_content)
+    for pattern, replacement in SECTION_HEADER_RES:
+        enhanced_content = pattern.sub(replacement, enhanced_content)
     
     # 5. Format code blocks
-    enhanced_content = re.sub(
-        r'```(yaml|json|javascript|python)?\n(.*?)\n```',
+    enhanced_content = CODE_BLOCK_RE.sub(
         r'<div style="background: #0f172a; border: 1px solid #334155; border-radius: 8px; padding: 15px; margin: 15px 0; font-family: monospace; overflow-x: auto;"><pre style="color: #e2e8f0; margin: 0; white-space: pre-wrap;"><code>\2</code></pre></div>',
-        enhanced_content,
-        flags=re.DOTALL
-    )
+        enhanced_content)
     
     # 7. Format numbered lists with better styling
-    enhanced_content = re.sub(r'^(\d+\. .+)$', r'<div style="background: rgba(59, 130, 246, 0.05); border-left: 3px solid #3b82f6; padding: 10px; margin: 5px 0; border-radius: 0 6px 6px 0;">\1</div>', enhanced_content, flags=re.MULTILINE)
+    enhanced_content = NUMBERED_ITEM_RE.sub(r'<div style="background: rgba(59, 130, 246, 0.05); border-left: 3px solid #3b82f6; padding: 10px; margin: 5px 0; border-radius: 0 6px 6px 0;">\1</div>', enhanced_content)
     
     # 8. Format bullet points
-    enhanced_content = re.sub(r'^- (.+)$', r'<div style="background: rgba(99, 102, 241, 0.03); border-left: 2px solid #6366f1; padding: 8px 12px; margin: 3px 0; border-radius: 0 4px 4px 0;">• \1</div>', enhanced_content, flags=re.MULTILINE)
+    enhanced_content = BULLET_ITEM_RE.sub(r'<div style="background: rgba(99, 102, 241, 0.03); border-left: 2px solid #6366f1; padding: 8px 12px; margin: 3px 0; border-radius: 0 4px 4px 0;">• \1</div>', enhanced_content)
     
     return enhanced_content
 
+# Minimum seconds between re-formatting the streamed analysis
+STREAM_RENDER_INTERVAL = 0.25
+
+async def _iter_stream_events(response):
+    """Yield decoded JSON events from the backend's server-sent event stream"""
+    buffer = ""
+    async for chunk in response.aiter_text():
+        buffer += chunk
+        
+        while "\n\n" in buffer:
+            line, buffer = buffer.split("\n\n", 1)
+            if not line.startswith("data: "):
+                continue
+            data_str = line[6:]  # Remove "data: " prefix
+            
+            if data_str == "[DONE]":
+                return
+            
+            try:
+                yield json_loads(data_str)
+            except json.JSONDecodeError:
+                continue  # Skip malformed JSON
+
 async def start_analysis_streaming():
     """Start streaming API analysis using backend"""
     if not current_spec:
         yield "❌ Please upload an API specification first"
         return
     
+    # Re-analyzing an unchanged spec would repeat the same long LLM call
+    cache = _get_spec_cache()
+    if 'analysis' in cache:
+        logger.info("Serving cached analysis for the loaded spec")
+        yield cache['analysis']
+        return
+    
+    analysis_content = ""
     try:
         logger.info("Starting streaming API analysis via backend")
-        async with httpx.AsyncClient(timeout=300.0) as client:  # 5 minute timeout for streaming
-            async with client.stream(
-                "POST",
-                "http://localhost:8080/analyze-stream",
-                json={
-                    "openapi_spec": current_spec,
-                    "focus_areas": ["security", "performance", "documentation", "completeness", "standards"]
-                }
-            ) as response:
-                
-                if response.status_code != 200:
-                    if response.status_code == 503:
-                        yield "❌ Analysis unavailable - Please set your OpenAI API key first"
-                    else:
-                        yield f"❌ Analysis failed with status {response.status_code}"
+        async with _get_http_client().stream(
+            "POST",
+            "http://localhost:8080/analyze-stream",
+            content=_spec_request_body(focus_areas=ANALYSIS_FOCUS_AREAS),
+            headers=JSON_HEADERS,
+            timeout=300.0  # 5 minute timeout for streaming
+        ) as response:
+            
+            if response.status_code != 200:
+                if response.status_code == 503:
+                    yield "❌ Analysis unavailable - Please set your OpenAI API key first"
+                else:
+                    yield f"❌ Analysis failed with status {response.status_code}"
+                return
+            
+            # Re-rendering the full analysis is linear in its length, so
+            # format at most once per interval and once more at the end
+            last_render = 0.0
+            formatted = None
+            rendered = True
+            
+            async for data in _iter_stream_events(response):
+                if "error" in data:
+                    yield f"❌ Error: {data['error']}"
                     return
-                
-                buffer = ""
-                analysis_content = ""
-                
-                async for chunk in response.aiter_text():
-                    buffer += chunk
-                    
-                    while "\n\n" in buffer:
-                        line, buffer = buffer.split("\n\n", 1)
-                        if line.startswith("data: "):
-                            data_str = line[6:]  # Remove "data: " prefix
-                            
-                            if data_str == "[DONE]":
-                                logger.info("Streaming analysis completed successfully")
-                                return
-                            
-                            try:
-                                import json
-                                data = json.loads(data_str)
-                                
-                                if "error" in data:
-                                    yield f"❌ Error: {data['error']}"
-                                    return
-                                elif "status" in data:
-                                    yield f"🔄 {data['message']}"
-                                elif "content" in data:
-                                    analysis_content += data["content"]
-                                    # Apply enhanced formatting to the content
-                                    enhanced_content = enhance_analysis_formatting(analysis_content)
-                                    yield enhanced_content
-                                    
-                            except json.JSONDecodeError:
-                                continue  # Skip malformed JSON
-                
+                elif "status" in data:
+                    if data["status"] == "complete":
+                        break
+                    # Progress messages only until analysis text arrives
+                    if not analysis_content:
+                        yield f"🔄 {data['message']}"
+                elif "content" in data:
+                    analysis_content += data["content"]
+                    rendered = False
+                    now = time.monotonic()
+                    if now - last_render >= STREAM_RENDER_INTERVAL:
+                        last_render = now
+                        rendered = True
+                        formatted = enhance_analysis_formatting(analysis_content)
+                        yield formatted
+            
+            if not rendered:
+                formatted = enhance_analysis_formatting(analysis_content)
+                yield formatted
+            if formatted is not None:
+                cache['analysis'] = formatted
+            logger.info("Streaming analysis completed successfully")
+            
     except Exception as e:
-        error_msg = f"❌ Streaming analysis error: {str(e)}"
-        logger.error(error_msg)
-        yield error_msg
+        logger.error(f"❌ Streaming analysis error: {str(e)}")
+        # Fall back to the non-streaming endpoint if nothing was streamed yet
+        if analysis_content:
+            yield f"❌ Streaming analysis error: {str(e)}"
+            return
+        result = await start_analysis()
+        yield result[0]
 
 async def start_analysis():
     """Start API analysis (non-streaming fallback)"""
     if not current_spec:
         return "❌ Please upload an API specification first", "", None
     
+    cache = _get_spec_cache()
+    if 'analysis' in cache:
+        logger.info("Serving cached analysis for the loaded spec")
+        return cache['analysis'], "Analysis completed", None
+    
     try:
         logger.info("Starting API analysis via backend")
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "http://localhost:8080/analyze",
-                json={
-                    "openapi_spec": current_spec,
-                    "focus_areas": ["security", "performance", "documentation", "completeness", "standards"]
-                },
-                timeout=60.0
-            )
+        response = await _get_http_client().post(
+            "http://localhost:8080/analyze",
+            content=_spec_request_body(focus_areas=ANALYSIS_FOCUS_AREAS),
+            headers=JSON_HEADERS,
+            timeout=60.0
+        )
+        
+        if response.status_code == 200:
+            result = json_loads(response.content)
+            analysis = result.get("analysis", "Analysis completed successfully")
+            # Apply enhanced formatting to the analysis
+            enhanced_analysis = enhance_analysis_formatting(analysis)
+            cache['analysis'] = enhanced_analysis
+            logger.info("Analysis completed successfully")
+            return enhanced_analysis, "Analysis completed", None
+        elif response.status_code == 503:
+            error_msg = "❌ Analysis unavailable - Please set your OpenAI API key first"
+            logger.error(error_msg)
+            return error_msg, "", None
+        else:
+            error_msg = f"Analysis failed with status {response.status_code}"
+            logger.error(error_msg)
+            return error_msg, "", None
             
-            if response.status_code == 200:
-                result = response.json()
-                analysis = result.get("analysis", "Analysis completed successfully")
-                # Apply enhanced formatting to the analysis
-                enhanced_analysis = enhance_analysis_formatting(analysis)
-                logger.info("Analysis completed successfully")
-                return enhanced_analysis, "Analysis completed", None
-            elif response.status_code == 503:
-                error_msg = "❌ Analysis unavailable - Please set your OpenAI API key first"
-                logger.error(error_msg)
-                return error_msg, "", None
-            else:
-                error_msg = f"Analysis failed with status {response.status_code}"
-                logger.error(error_msg)
-                return error_msg, "", None
-                
     except Exception as e:
         error_msg = f"Analysis error: {str(e)}"
         logger.error(error_msg)
         return error_msg, "", None
 
-def chat_with_api(message, history):
-    """Chat with the API using RAG backend with comprehensive logging"""
-    logger.info(f"RAG chat request received - Message length: {len(message.strip())} chars")
-    
-    if not message.strip():
-        logger.warning("Empty message received in chat")
-        return history, ""
-    
-    if not current_spec:
-        logger.warning("Chat attempted without API specification loaded")
-        history.append([message, "Please upload an API specification first to enable AI assistance."])
-        return history, ""
+def _format_metric_section(section, value):
+    """Render one RAG Triad metric with its explanation and interpretation"""
+    _, heading, info, thresholds, fallback = section
+    verdict = next((text for minimum, text in thresholds if value >= minimum), fallback)
+    return f"### {heading}: {value:.3f}**\n{info}{verdict}\n"
+
+def format_rag_evaluation(rag_triad, performance):
+    """Format DeepEval RAG Triad scores and performance metrics for the chat"""
+    eval_display = RAG_EVAL_HEADER
+
+    # Answer Relevancy, Faithfulness and Contextual Relevancy
+    scores = {}
+    for section in RAG_METRIC_SECTIONS:
+        key = section[0]
+        scores[key] = rag_triad.get(key, 0)
+        eval_display += _format_metric_section(section, scores[key]) + "\n"
+    answer_relevancy = scores['answer_relevancy']
+    faithfulness = scores['faithfulness']
+    contextual_relevancy = scores['contextual_relevancy']
+
+    # Overall Score
+    overall_score = rag_triad.get('overall_score', 0)
+    eval_display += f"### 🏆 **Overall Score: {overall_score:.3f}**\n"
+    eval_display += OVERALL_SCORE_INFO
+    eval_display += f"**Breakdown:** `(0.4 × {answer_relevancy:.3f} + 0.4 × {faithfulness:.3f} + 0.2 × {contextual_relevancy:.3f}) = {overall_score:.3f}`\n"
+    eval_display += "\n"
+
+    # Confidence Score
+    eval_display += _format_metric_section(CONFIDENCE_SECTION, rag_triad.get('confidence', 0))
+
+    # Add performance metrics if available
+    if performance:
+        eval_display += f"\n⚡ **Performance:**\n"
+        eval_display += f"Search: {performance.get('search_time_ms', 0):.1f}ms | "
+        eval_display += f"LLM: {performance.get('llm_time_ms', 0):.1f}ms | "
+        eval_display += f"Total: {performance.get('total_time_ms', 0):.1f}ms\n"
+        eval_display += f"Tokens/sec: {performance.get('tokens_per_second', 0):.1f}\n"
+
+    # Add quality assessment with educational explanation
+    eval_display += QUALITY_ASSESSMENT_HEADER
+    _, heading, meaning, advice = next(
+        (tier for tier in QUALITY_TIERS if overall_score >= tier[0]), QUALITY_FALLBACK_TIER
+    )
+    eval_display += f"### {heading} (Score: {overall_score:.3f})\n"
+    eval_display += meaning
+    eval_display += advice
+
+    # Add learning tips
+    eval_display += TIPS_HEADER
+    if answer_relevancy < 0.7:
+        eval_display += "• **Be more specific:** Your question might be too broad or vague\n"
+    if faithfulness < 0.7:
+        eval_display += "• **Check documentation:** The system may lack sufficient context\n"
+    if contextual_relevancy < 0.7:
+        eval_display += "• **Provide context:** Include more details about your use case\n"
+    if overall_score >= 0.7:
+        eval_display += "• **Great job!** Your question was well-formed and got quality results\n"
     
-    # Log spec context info
-    spec_title = current_spec.get('info', {}).get('title', 'Unknown API')
-    spec_endpoints = len(current_spec.get('paths', {}))
-    logger.info(f"Processing RAG query for {spec_title} with {spec_endpoints} endpoints")
+    return eval_display
+
+async def _chat_turn(client, message, history):
+    """Run a single RAG chat turn against the backend and append it to history"""
+    history = list(history or [])
     
     try:
-        # Call enhanced RAG endpoint with DeepEval integration
-        logger.info("Sending request to enhanced RAG backend at localhost:8080/rag-query-v2")
-        import requests
-        response = requests.post(
+        response = await client.post(
             "http://localhost:8080/rag-query-v2",
-            json={
-                "question": message,
-                "openapi_spec": current_spec
-            },
-            timeout=30.0
+            content=_spec_request_body(question=message),
+            headers=JSON_HEADERS
         )
         
         logger.info(f"RAG backend response - Status: {response.status_code}")
         
         if response.status_code == 200:
-            result = response.json()
+            result = json_loads(response.content)
             answer = result.get("answer", "Sorry, I couldn't generate a response.")
             metadata = result.get("metadata", {})
             rag_triad = metadata.get("rag_triad_evaluation", {})
@@ -620,122 +919,7 @@ def chat_with_api(message, history):
             
             # Add DeepEval RAG Triad scores if available
             if rag_triad:
-                eval_display = f"\n\n📊 **DeepEval RAG Triad Evaluation Results:**\n"
-                eval_display += "=" * 60 + "\n\n"
-                
-                # Answer Relevancy Score
-                answer_relevancy = rag_triad.get('answer_relevancy', 0)
-                eval_display += f"### 🎯 **Answer Relevancy: {answer_relevancy:.3f}**\n"
-                eval_display += "**What it measures:** How well the answer addresses your specific question\n"
-                eval_display += "**Formula:** `Cosine Similarity(Question Embedding, Answer Embedding)`\n"
-                eval_display += "**Interpretation:** "
-                if answer_relevancy >= 0.8:
-                    eval_display += "✅ Excellent - Answer directly addresses the question\n"
-                elif answer_relevancy >= 0.6:
-                    eval_display += "✔️ Good - Answer is mostly relevant with minor deviations\n"
-                elif answer_relevancy >= 0.4:
-                    eval_display += "⚠️ Fair - Answer partially addresses the question\n"
-                else:
-                    eval_display += "❌ Poor - Answer may be off-topic or incomplete\n"
-                eval_display += "\n"
-                
-                # Faithfulness Score
-                faithfulness = rag_triad.get('faithfulness', 0)
-                eval_display += f"### 🔍 **Faithfulness: {faithfulness:.3f}**\n"
-                eval_display += "**What it measures:** Accuracy of the answer relative to source documents\n"
-                eval_display += "**Formula:** `(Verified Claims / Total Claims)` where claims are validated against context\n"
-                eval_display += "**Interpretation:** "
-                if faithfulness >= 0.9:
-                    eval_display += "✅ Excellent - All claims are supported by documentation\n"
-                elif faithfulness >= 0.7:
-                    eval_display += "✔️ Good - Most claims are accurate with minor issues\n"
-                elif faithfulness >= 0.5:
-                    eval_display += "⚠️ Fair - Some claims lack proper support\n"
-                else:
-                    eval_display += "❌ Poor - Answer contains unsupported or incorrect claims\n"
-                eval_display += "\n"
-                
-                # Contextual Relevancy Score
-                contextual_relevancy = rag_triad.get('contextual_relevancy', 0)
-                eval_display += f"### 📋 **Contextual Relevancy: {contextual_relevancy:.3f}**\n"
-                eval_display += "**What it measures:** Quality of retrieved documentation chunks\n"
-                eval_display += "**Formula:** `(Relevant Chunks / Total Retrieved Chunks)`\n"
-                eval_display += "**Interpretation:** "
-                if contextual_relevancy >= 0.8:
-                    eval_display += "✅ Excellent - Retrieved highly relevant documentation\n"
-                elif contextual_relevancy >= 0.6:
-                    eval_display += "✔️ Good - Most retrieved content is useful\n"
-                elif contextual_relevancy >= 0.4:
-                    eval_display += "⚠️ Fair - Mixed relevance in retrieved content\n"
-                else:
-                    eval_display += "❌ Poor - Retrieved content has low relevance\n"
-                eval_display += "\n"
-                
-                # Overall Score
-                overall_score = rag_triad.get('overall_score', 0)
-                eval_display += f"### 🏆 **Overall Score: {overall_score:.3f}**\n"
-                eval_display += "**Calculation:** Weighted average of all metrics\n"
-                eval_display += f"**Formula:** `(0.4 × Answer Relevancy + 0.4 × Faithfulness + 0.2 × Context Relevancy)`\n"
-                eval_display += f"**Breakdown:** `(0.4 × {answer_relevancy:.3f} + 0.4 × {faithfulness:.3f} + 0.2 × {contextual_relevancy:.3f}) = {overall_score:.3f}`\n"
-                eval_display += "\n"
-                
-                # Confidence Score
-                confidence = rag_triad.get('confidence', 0)
-                eval_display += f"### 🎲 **Confidence: {confidence:.3f}**\n"
-                eval_display += "**What it measures:** System's confidence in the evaluation\n"
-                eval_display += "**Formula:** `min(1.0, Overall Score × Context Quality Factor × Response Coherence)`\n"
-                eval_display += "**Interpretation:** "
-                if confidence >= 0.8:
-                    eval_display += "✅ High confidence - Reliable evaluation\n"
-                elif confidence >= 0.6:
-                    eval_display += "✔️ Moderate confidence - Generally trustworthy\n"
-                elif confidence >= 0.4:
-                    eval_display += "⚠️ Low confidence - Results may vary\n"
-                else:
-                    eval_display += "❌ Very low confidence - Evaluation uncertain\n"
-                
-                # Add performance metrics if available
-                if performance:
-                    eval_display += f"\n⚡ **Performance:**\n"
-                    eval_display += f"Search: {performance.get('search_time_ms', 0):.1f}ms | "
-                    eval_display += f"LLM: {performance.get('llm_time_ms', 0):.1f}ms | "
-                    eval_display += f"Total: {performance.get('total_time_ms', 0):.1f}ms\n"
-                    eval_display += f"Tokens/sec: {performance.get('tokens_per_second', 0):.1f}\n"
-                
-                # Add quality assessment with educational explanation
-                eval_display += "\n" + "=" * 60 + "\n"
-                eval_display += "## 📈 **Quality Assessment**\n"
-                overall_score = rag_triad.get('overall_score', 0)
-                
-                if overall_score >= 0.8:
-                    eval_display += f"### ✅ **Excellent Quality** (Score: {overall_score:.3f})\n"
-                    eval_display += "**What this means:** The AI has provided a highly accurate, relevant, and well-supported answer.\n"
-                    eval_display += "**You can:** Trust this response with high confidence for critical decisions.\n"
-                elif overall_score >= 0.6:
-                    eval_display += f"### ✔️ **Good Quality** (Score: {overall_score:.3f})\n"
-                    eval_display += "**What this means:** The answer is generally reliable with minor areas for improvement.\n"
-                    eval_display += "**You can:** Use this response confidently, but verify critical details.\n"
-                elif overall_score >= 0.4:
-                    eval_display += f"### ⚠️ **Fair Quality** (Score: {overall_score:.3f})\n"
-                    eval_display += "**What this means:** The answer has some useful information but may lack completeness or accuracy.\n"
-                    eval_display += "**You should:** Cross-reference important information and ask follow-up questions.\n"
-                else:
-                    eval_display += f"### ❌ **Needs Improvement** (Score: {overall_score:.3f})\n"
-                    eval_display += "**What this means:** The answer may be off-topic, incomplete, or contain inaccuracies.\n"
-                    eval_display += "**You should:** Rephrase your question or provide more context for better results.\n"
-                
-                # Add learning tips
-                eval_display += "\n### 💡 **Tips for Better Results:**\n"
-                if answer_relevancy < 0.7:
-                    eval_display += "• **Be more specific:** Your question might be too broad or vague\n"
-                if faithfulness < 0.7:
-                    eval_display += "• **Check documentation:** The system may lack sufficient context\n"
-                if contextual_relevancy < 0.7:
-                    eval_display += "• **Provide context:** Include more details about your use case\n"
-                if overall_score >= 0.7:
-                    eval_display += "• **Great job!** Your question was well-formed and got quality results\n"
-                    
-                enhanced_answer += eval_display
+                enhanced_answer += format_rag_evaluation(rag_triad, performance)
             
             logger.info(f"RAG response received - Answer length: {len(answer)} chars, RAG Triad: {bool(rag_triad)}")
             history.append([message, enhanced_answer])
@@ -749,19 +933,52 @@ def chat_with_api(message, history):
         logger.error(f"RAG request failed: {str(e)}")
         history.append([message, error_msg])
     
-    return history, ""
+    return history
+
+async def chat_with_api_batch(messages, histories):
+    """Chat with the API using RAG backend, handling a batch of concurrent submissions"""
+    logger.info(f"RAG chat batch received - {len(messages)} message(s)")
+    
+    if not current_spec:
+        logger.warning("Chat attempted without API specification loaded")
+        updated = []
+        for message, history in zip(messages, histories):
+            history = list(history or [])
+            if message.strip():
+                history.append([message, "Please upload an API specification first to enable AI assistance."])
+            updated.append(history)
+        return updated, [""] * len(messages)
+    
+    # Spec context is shared by every message and cached per loaded spec
+    cache = _get_spec_cache()
+    if 'chat_context' not in cache:
+        cache['chat_context'] = (
+            current_spec.get('info', {}).get('title', 'Unknown API'),
+            len(current_spec.get('paths', {}))
+        )
+    spec_title, spec_endpoints = cache['chat_context']
+    logger.info(f"Processing RAG batch for {spec_title} with {spec_endpoints} endpoints")
+    logger.info("Sending requests to enhanced RAG backend at localhost:8080/rag-query-v2")
+    
+    client = _get_http_client()
+    turns = []
+    for message, history in zip(messages, histories):
+        if not message.strip():
+            logger.warning("Empty message received in chat")
+            turns.append(asyncio.sleep(0, result=list(history or [])))
+        else:
+            turns.append(_chat_turn(client, message, history))
+    updated = await asyncio.gather(*turns)
+    
+    return list(updated), [""] * len(messages)
+
 
 def create_complete_interface():
     """Create the complete interface with both evaluation and assistant tabs"""
     with gr.Blocks(css=CUSTOM_CSS, title="APISage Complete - AI-Powered API Analysis & Assistant") as app:
         
         # Hero Section
-        gr.HTML("""
-        <div class="hero-section">
-            <div class="hero-title">🚀 APISage Complete</div>
-            <div class="hero-subtitle">Stage 1: API Analysis & Evaluation • Stage 2: RAG Assistant</div>
-        </div>
-        """)
+        gr.HTML(HERO_HTML)
         
         # Compact configuration section
         with gr.Row():
@@ -877,133 +1094,64 @@ def create_complete_interface():
                         )
                         
                         # Add DeepEval info panel
-                        gr.HTML("""
-                        <div style="margin-top: 20px; padding: 15px; background: rgba(100, 116, 139, 0.1); border-radius: 8px; border-left: 4px solid #64748b;">
-                            <h4 style="margin: 0 0 10px 0; color: #64748b;">🧪 Educational: Understanding RAG Evaluation</h4>
-                            <p style="margin: 0 0 10px 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
-                                <strong>What is RAG Triad?</strong><br>
-                                A comprehensive evaluation framework that measures three critical aspects of AI-generated responses:
-                            </p>
-                            <ul style="margin: 0; padding-left: 20px; font-size: 0.85rem; color: #94a3b8; line-height: 1.6;">
-                                <li><strong>🎯 Answer Relevancy:</strong> Semantic similarity between question and answer using cosine similarity of embeddings</li>
-                                <li><strong>🔍 Faithfulness:</strong> Percentage of claims in the answer that can be verified from source documents</li>
-                                <li><strong>📋 Context Relevancy:</strong> Ratio of relevant vs. irrelevant chunks in retrieved documentation</li>
-                            </ul>
-                            <p style="margin: 10px 0 0 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
-                                <strong>How Overall Score is Calculated:</strong><br>
-                                <code style="background: rgba(0,0,0,0.2); padding: 2px 4px; border-radius: 3px;">
-                                Overall = (0.4 × Answer Relevancy) + (0.4 × Faithfulness) + (0.2 × Context Relevancy)
-                                </code><br>
-                                <em style="font-size: 0.8rem;">Higher weights on answer quality, lower on retrieval quality</em>
-                            </p>
-                            <p style="margin: 10px 0 0 0; font-size: 0.85rem; color: #94a3b8; line-height: 1.4;">
-                                <strong>Why This Matters:</strong><br>
-                                • Transparency: See exactly how AI responses are evaluated<br>
-                                • Trust: Understand the reliability of each answer<br>
-                                • Learning: Improve your questions based on scoring feedback
-                            </p>
-                        </div>
-                        """)
+                        gr.HTML(RAG_TRIAD_INFO_HTML)
         
         # Compact footer
-        gr.HTML("""
-        <div style="text-align: center; margin-top: 1rem; opacity: 0.7; font-size: 0.9rem;">
-            <p>🔗 <a href="http://localhost:8080/docs" target="_blank">API Docs</a> • 
-            📍 Upload spec → Analyze → Ask questions</p>
-        </div>
-        """)
+        gr.HTML(FOOTER_HTML)
         
         # Event handlers
+        # Fast, local handlers bypass the queue; long-running analysis and
+        # batched chat stay queued
         set_key_btn.click(
             fn=set_api_key,
             inputs=[api_key_input],
             outputs=[key_status]
         ).then(
             fn=lambda: "",
-            outputs=[api_key_input]
+            outputs=[api_key_input],
+            queue=False
         )
         
         file_input.change(
             fn=load_api_spec,
             inputs=[file_input],
-            outputs=[spec_display, api_info_display, status_display]
+            outputs=[spec_display, api_info_display, status_display],
+            queue=False
         ).then(
             fn=lambda: gr.update(visible=True),
-            outputs=[analyze_btn]
+            outputs=[analyze_btn],
+            queue=False
         )
         
         demo_btn.click(
             fn=load_demo,
-            outputs=[spec_display, api_info_display, status_display]
+            outputs=[spec_display, api_info_display, status_display],
+            queue=False
         ).then(
             fn=lambda: gr.update(visible=True),
-            outputs=[analyze_btn]
+            outputs=[analyze_btn],
+            queue=False
         )
         
-        def start_streaming_analysis():
-            """Wrapper to handle streaming analysis"""
-            import asyncio
-            
-            if not current_spec:
-                return "❌ Please upload an API specification first"
-            
-            # Initialize with starting message
-            analysis_text = "🔄 Initializing analysis..."
-            
-            try:
-                # Create event loop if not exists
-                try:
-                    loop = asyncio.get_event_loop()
-                except RuntimeError:
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                
-                # Run the streaming analysis
-                stream_gen = start_analysis_streaming()
-                
-                # Collect all streaming content
-                full_analysis = ""
-                async def collect_stream():
-                    nonlocal full_analysis
-                    async for chunk in stream_gen:
-                        full_analysis = chunk
-                    return full_analysis
-                
-                # Run async function
-                if loop.is_running():
-                    # If loop is running, use asyncio.create_task
-                    task = loop.create_task(collect_stream())
-                    result = task.result() if task.done() else full_analysis
-                else:
-                    result = loop.run_until_complete(collect_stream())
-                
-                return result or "Analysis completed"
-                
-            except Exception as e:
-                logger.error(f"Streaming analysis wrapper error: {str(e)}")
-                # Fallback to regular analysis
-                try:
-                    loop = asyncio.get_event_loop()
-                    result = loop.run_until_complete(start_analysis())
-                    return result[0] if isinstance(result, tuple) else str(result)
-                except Exception as fallback_error:
-                    return f"❌ Analysis failed: {str(fallback_error)}"
-
         analyze_btn.click(
-            fn=start_streaming_analysis,
+            fn=start_analysis_streaming,
             outputs=[analysis_output]
         )
         
         send_btn.click(
-            fn=chat_with_api,
+            fn=chat_with_api_batch,
             inputs=[msg_input, chatbot],
-            outputs=[chatbot, msg_input]
+            outputs=[chatbot, msg_input],
+            batch=True,
+            max_batch_size=8
         )
         
         msg_input.submit(
-            fn=chat_with_api,
+            fn=chat_with_api_batch,
             inputs=[msg_input, chatbot],
-            outputs=[chatbot, msg_input]
+            outputs=[chatbot, msg_input],
+            batch=True,
+            max_batch_size=8
         )
         
         return app
@@ -1024,6 +1172,9 @@ if __name__ == "__main__":
     try:
         logger.info("Creating complete interface with both analysis and assistant tabs")
         app = create_complete_interface()
+        # Queueing is required for batched chat handlers; several workers keep
+        # a long streaming analysis from blocking chat and API key events
+        app.queue(concurrency_count=4)
         
         logger.info("Launching Gradio application")
         app.launch(
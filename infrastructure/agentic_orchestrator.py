@@ -8,7 +8,7 @@ import asyncio
 import json
 import time
 from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 import structlog
 
@@ -197,13 +197,16 @@ Each finding should include type, severity, title, description, location, and fi
     
     def _extract_api_info(self, api_spec: Dict[str, Any]) -> Dict[str, Any]:
         """Extract key API information for analysis"""
+        info = api_spec.get("info") or {}
+        paths = api_spec.get("paths") or {}
+        components = api_spec.get("components") or {}
         return {
-            "title": api_spec.get("info", {}).get("title", "Unknown API"),
-            "version": api_spec.get("info", {}).get("version", "Unknown"),
-            "endpoints": list(api_spec.get("paths", {}).keys()),
-            "has_security": bool(api_spec.get("security") or api_spec.get("components", {}).get("securitySchemes")),
-            "endpoint_count": len(api_spec.get("paths", {})),
-            "schema_count": len(api_spec.get("components", {}).get("schemas", {}))
+            "title": info.get("title", "Unknown API"),
+            "version": info.get("version", "Unknown"),
+            "endpoints": list(paths),
+            "has_security": bool(api_spec.get("security") or components.get("securitySchemes")),
+            "endpoint_count": len(paths),
+            "schema_count": len(components.get("schemas") or {})
         }
     
     def _parse_structured_response(self, response: str) -> tuple:
@@ -4,6 +4,7 @@ Clean, focused implementation for LLM integration
 """
 
 import asyncio
+import json
 import os
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
@@ -140,8 +141,6 @@ class SimpleLLMManager:
         """
         Generate streaming response from LLM
         """
-        import json
-        
         if not self.client:
             yield f"data: {json.dumps({'error': 'LLM not available - please set OPENAI_API_KEY'})}\n\n"
             return
@@ -17,7 +17,6 @@ import aiofiles
 import websockets
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-import requests
 import yaml
 
 logger = structlog.get_logger(__name__)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Semantic Response Cache for RAG queries
+Serves near-duplicate questions from cache using query embedding similarity
+"""
+
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import structlog
+
+try:
+    from sentence_transformers import (  # type: ignore[import-not-found]
+        SentenceTransformer,
+    )
+
+    EMBEDDINGS_AVAILABLE = True
+except ImportError:
+    EMBEDDINGS_AVAILABLE = False
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """A cached RAG response and its usage statistics"""
+
+    namespace: str
+    query_key: str
+    response: Dict[str, Any]
+    created_at: float
+    last_access: float
+    hits: int = 0
+
+
+class SemanticCache:
+    """Embedding-keyed response cache with TTL, LRU and LFU eviction"""
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: int = 3600,
+        model_name: str = "all-MiniLM-L6-v2",
+    ) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_name = model_name
+        self.logger = logger.bind(component="semantic_cache")
+
+        self._entries: List[CacheEntry] = []
+        self._exact: Dict[tuple, int] = {}
+        # Row i of the matrix holds the embedding of _entries[i]; capacity grows
+        # geometrically so inserts don't reallocate and lookups are one matvec
+        self._matrix: Optional[np.ndarray] = None
+        self._namespace_ids = np.empty(0, dtype=np.int32)
+        self._namespace_index: Dict[str, int] = {}
+        self._model: Any = None
+        self._model_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache may hold entries; max_entries <= 0 disables it"""
+        return self.max_entries > 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query for exact-match lookups and request coalescing"""
+        return " ".join(query.lower().split())
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        """Return an L2-normalized embedding, or None when embeddings are unavailable"""
+        if not EMBEDDINGS_AVAILABLE:
+            return None
+        if self._model is None:
+            # Lookups arrive from several worker threads; load the model only once
+            with self._model_lock:
+                if self._model is None:
+                    self.logger.info("Loading embedding model", model=self.model_name)
+                    self._model = SentenceTransformer(self.model_name)
+        vector = self._model.encode(query, normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+
+    def _is_expired(self, entry: CacheEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_seconds
+
+    def _grow(self, dim: int) -> np.ndarray:
+        """Reallocate the embedding matrix with room for more rows"""
+        size = len(self._entries)
+        capacity = max(16, size * 2)
+        matrix = np.empty((capacity, dim), dtype=np.float32)
+        namespace_ids = np.empty(capacity, dtype=np.int32)
+        if self._matrix is not None:
+            matrix[:size] = self._matrix[:size]
+            namespace_ids[:size] = self._namespace_ids[:size]
+        self._matrix = matrix
+        self._namespace_ids = namespace_ids
+        return matrix
+
+    def _append(self, entry: CacheEntry, embedding: Optional[np.ndarray]) -> None:
+        """Add an entry and its embedding at the end of the lookup structures"""
+        index = len(self._entries)
+        if embedding is not None:
+            matrix = self._matrix
+            if matrix is None or index >= matrix.shape[0]:
+                matrix = self._grow(embedding.shape[0])
+            matrix[index] = embedding
+            self._namespace_ids[index] = self._namespace_index.setdefault(
+                entry.namespace, len(self._namespace_index)
+            )
+        self._exact[(entry.namespace, entry.query_key)] = index
+        self._entries.append(entry)
+
+    def _remove(self, index: int) -> CacheEntry:
+        """Remove the entry at index by moving the last entry into its slot"""
+        entry = self._entries[index]
+        del self._exact[(entry.namespace, entry.query_key)]
+        last = len(self._entries) - 1
+        if index != last:
+            moved = self._entries[last]
+            self._entries[index] = moved
+            self._exact[(moved.namespace, moved.query_key)] = index
+            if self._matrix is not None:
+                self._matrix[index] = self._matrix[last]
+                self._namespace_ids[index] = self._namespace_ids[last]
+        self._entries.pop()
+        return entry
+
+    def _evict_expired(self, now: float) -> None:
+        for index in range(len(self._entries) - 1, -1, -1):
+            if self._is_expired(self._entries[index], now):
+                self._remove(index)
+                self.stats["evictions"] += 1
+
+    def _evict_one(self) -> None:
+        """Evict the least frequently used entry, then the least recently accessed"""
+        victim = min(
+            range(len(self._entries)),
+            key=lambda i: (self._entries[i].hits, self._entries[i].last_access),
+        )
+        self._remove(victim)
+        self.stats["evictions"] += 1
+
+    def _find(
+        self, namespace: str, query_key: str, embedding: Optional[np.ndarray]
+    ) -> Optional[int]:
+        """Locate the best matching entry index for a query"""
+        index = self._exact.get((namespace, query_key))
+        if (
+            index is not None
+            or embedding is None
+            or self._matrix is None
+            or not self._entries
+        ):
+            return index
+
+        namespace_id = self._namespace_index.get(namespace)
+        if namespace_id is None:
+            return None
+
+        size = len(self._entries)
+        scores = self._matrix[:size] @ embedding
+        scores[self._namespace_ids[:size] != namespace_id] = -1.0
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return best
+        return None
+
+    def get(self, query: str, namespace: str = "") -> Optional[Dict[str, Any]]:
+        """Return a cached response for a semantically equivalent query, if any"""
+        if not self.enabled:
+            return None
+        query_key = self.normalize_query(query)
+        embedding = self._embed(query_key)
+        now = time.time()
+
+        with self._lock:
+            self._evict_expired(now)
+            index = self._find(namespace, query_key, embedding)
+            if index is None:
+                self.stats["misses"] += 1
+                return None
+
+            entry = self._entries[index]
+            entry.hits += 1
+            entry.last_access = now
+            self.stats["hits"] += 1
+
+        self.logger.info("Semantic cache hit", hits=entry.hits, namespace=namespace[:8])
+        return entry.response
+
+    def put(self, query: str, response: Dict[str, Any], namespace: str = "") -> None:
+        """Cache a response for a query"""
+        if not self.enabled:
+            return
+        query_key = self.normalize_query(query)
+        embedding = self._embed(query_key)
+        now = time.time()
+
+        with self._lock:
+            existing = self._exact.get((namespace, query_key))
+            if existing is not None:
+                self._remove(existing)
+            while len(self._entries) >= self.max_entries:
+                self._evict_one()
+
+            self._append(
+                CacheEntry(
+                    namespace=namespace,
+                    query_key=query_key,
+                    response=response,
+                    created_at=now,
+                    last_access=now,
+                ),
+                embedding,
+            )
+
+    def _clear_unlocked(self) -> None:
+        self._entries.clear()
+        self._exact.clear()
+        self._namespace_index.clear()
+
+    def clear(self) -> None:
+        """Remove all cached entries"""
+        with self._lock:
+            self._clear_unlocked()
+
+    def save(self, path: str) -> None:
+        """Persist cached entries and embeddings to disk"""
+        with self._lock:
+            entries = list(self._entries)
+            embeddings = (
+                self._matrix[: len(entries)].copy()
+                if self._matrix is not None
+                else None
+            )
+        payload: Dict[str, Any] = {
+            "model_name": self.model_name,
+            "entries": entries,
+            "embeddings": embeddings,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Write beside the target and swap it in, so an interrupted save never
+        # leaves a truncated file for load() to read at the next startup
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.logger.info("Semantic cache saved", path=path, entries=len(entries))
+
+    def load(self, path: str) -> None:
+        """Restore cached entries from disk, skipping anything already expired"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+
+        entries = payload.get("entries", [])
+        embeddings = payload.get("embeddings")
+        # Embeddings from a different model (or a run without one) are not comparable
+        if (
+            not EMBEDDINGS_AVAILABLE
+            or embeddings is None
+            or payload.get("model_name") != self.model_name
+            or len(embeddings) != len(entries)
+        ):
+            embeddings = None
+
+        now = time.time()
+        with self._lock:
+            self._clear_unlocked()
+            for i, entry in enumerate(entries):
+                if (
+                    self._is_expired(entry, now)
+                    or len(self._entries) >= self.max_entries
+                ):
+                    continue
+                if EMBEDDINGS_AVAILABLE and embeddings is None:
+                    continue
+                self._append(entry, embeddings[i] if embeddings is not None else None)
+        self.logger.info("Semantic cache loaded", path=path, entries=len(self._entries))
+
+
+# Global cache instance
+_semantic_cache: Optional[SemanticCache] = None
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Get the process-wide semantic cache"""
+    global _semantic_cache
+    if _semantic_cache is None:
+        _semantic_cache = SemanticCache(
+            similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+            max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+            ttl_seconds=int(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+        )
+    return _semantic_cache
@@ -4,9 +4,7 @@ Token Optimization Engine inspired by TheAgentic's ThinkRight approach
 Reduces token usage by 55-90% while maintaining accuracy
 """
 
-import re
 import json
-import hashlib
 import time
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -137,14 +135,16 @@ class APISpecCompressor:
     
     def _extract_metadata(self, spec: Dict[str, Any]) -> Dict[str, Any]:
         """Extract metadata for quick analysis"""
-        paths = spec.get("paths", {})
+        paths = spec.get("paths") or {}
+        components = spec.get("components") or {}
+        security_schemes = components.get("securitySchemes") or {}
         
         return {
             "endpoints_count": len(paths),
             "methods_count": sum(len(methods) for methods in paths.values()),
-            "has_auth": bool(spec.get("security") or spec.get("components", {}).get("securitySchemes")),
-            "schemas_count": len(spec.get("components", {}).get("schemas", {})),
-            "auth_types": list(spec.get("components", {}).get("securitySchemes", {}).keys())
+            "has_auth": bool(spec.get("security") or security_schemes),
+            "schemas_count": len(components.get("schemas") or {}),
+            "auth_types": list(security_schemes)
         }
 
 
@@ -227,9 +227,10 @@ class TokenOptimizer:
         prompts = []
         
         # Base analysis context (shared across all prompts)
-        base_context = f"""API: {spec.get('info', {}).get('title', 'Unknown')}
-Endpoints: {spec.get('_metadata', {}).get('endpoints_count', 0)}
-Security: {'Yes' if spec.get('_metadata', {}).get('has_auth') else 'No'}
+        metadata = spec.get('_metadata') or {}
+        base_context = f"""API: {(spec.get('info') or {}).get('title', 'Unknown')}
+Endpoints: {metadata.get('endpoints_count', 0)}
+Security: {'Yes' if metadata.get('has_auth') else 'No'}
 
 """
         
@@ -0,0 +1,56 @@
+"""Tests for request-body helpers in the Gradio frontend"""
+
+import json
+
+import pytest
+import yaml
+
+pytest.importorskip("gradio")
+pytest.importorskip("httpx")
+
+import gradio_app  # noqa: E402
+from config import json_codec  # noqa: E402
+
+YAML_SPEC = """
+openapi: 3.0.0
+info:
+  title: Pets
+  version: 1.0.0
+paths:
+  /pets:
+    get:
+      responses:
+        200:
+          description: OK
+        404:
+          description: Not found
+"""
+
+
+@pytest.fixture
+def yaml_spec():
+    spec = yaml.load(YAML_SPEC, Loader=gradio_app.YAML_LOADER)
+    assert 200 in spec["paths"]["/pets"]["get"]["responses"]
+    gradio_app._set_current_spec(spec)
+    yield spec
+    gradio_app._set_current_spec(None)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_spec_request_body_stringifies_int_response_codes(yaml_spec, monkeypatch, use_orjson):
+    if use_orjson and not json_codec.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(json_codec, "ORJSON_AVAILABLE", use_orjson)
+
+    body = json.loads(gradio_app._spec_request_body(question="What does GET /pets return?"))
+
+    assert body["question"] == "What does GET /pets return?"
+    responses = body["openapi_spec"]["paths"]["/pets"]["get"]["responses"]
+    assert set(responses) == {"200", "404"}
+
+
+def test_spec_request_body_without_other_fields_is_valid_json(yaml_spec):
+    body = json.loads(gradio_app._spec_request_body())
+
+    assert list(body) == ["openapi_spec"]
+    assert body["openapi_spec"]["info"]["title"] == "Pets"
@@ -0,0 +1,179 @@
+"""Tests for the semantic RAG response cache"""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("structlog")
+
+from infrastructure import semantic_cache as semantic_cache_module  # noqa: E402
+from infrastructure.semantic_cache import SemanticCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(semantic_cache_module.time, "time", fake.time)
+    return fake
+
+
+def make_cache(embeddings=None, **kwargs):
+    """Build a cache whose embeddings come from a fixed lookup table"""
+    cache = SemanticCache(**kwargs)
+    if embeddings is None:
+        cache._embed = lambda query: None
+    else:
+        cache._embed = lambda query: np.asarray(embeddings[query], dtype=np.float32)
+    return cache
+
+
+def assert_consistent(cache, embeddings=None):
+    """Every lookup structure must agree on which slot holds which entry"""
+    assert len(cache._exact) == len(cache._entries)
+    for index, entry in enumerate(cache._entries):
+        assert cache._exact[(entry.namespace, entry.query_key)] == index
+        if embeddings is not None:
+            np.testing.assert_array_equal(
+                cache._matrix[index], np.asarray(embeddings[entry.query_key], dtype=np.float32)
+            )
+            assert cache._namespace_ids[index] == cache._namespace_index[entry.namespace]
+
+
+def test_exact_match_hit_is_normalized_and_namespaced(clock):
+    cache = make_cache()
+    cache.put("How do I list pets?", {"answer": "GET /pets"}, namespace="spec-a")
+
+    assert cache.get("  how DO i list   pets? ", namespace="spec-a") == {"answer": "GET /pets"}
+    assert cache.get("How do I list pets?", namespace="spec-b") is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_similar_query_hits_within_namespace(clock):
+    embeddings = {
+        "list pets": [1.0, 0.0],
+        "show all pets": [0.96, 0.28],
+        "delete a pet": [0.0, 1.0],
+    }
+    cache = make_cache(embeddings, similarity_threshold=0.9)
+    cache.put("list pets", {"answer": "GET /pets"}, namespace="spec")
+
+    assert cache.get("show all pets", namespace="spec") == {"answer": "GET /pets"}
+    assert cache.get("delete a pet", namespace="spec") is None
+    assert cache.get("show all pets", namespace="other") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache(ttl_seconds=60)
+    cache.put("list pets", {"answer": "GET /pets"})
+
+    clock.now += 60
+    assert cache.get("list pets") == {"answer": "GET /pets"}
+
+    clock.now += 1
+    assert cache.get("list pets") is None
+    assert cache._entries == []
+    assert cache.stats["evictions"] == 1
+
+
+def test_eviction_prefers_least_frequently_then_least_recently_used(clock):
+    cache = make_cache(max_entries=2)
+    cache.put("first", {"answer": 1})
+    clock.now += 1
+    cache.put("second", {"answer": 2})
+    clock.now += 1
+    cache.get("first")
+
+    clock.now += 1
+    cache.put("third", {"answer": 3})
+
+    assert cache.get("second") is None
+    assert cache.get("first") == {"answer": 1}
+    assert cache.get("third") == {"answer": 3}
+    assert cache.stats["evictions"] == 1
+
+
+def test_swap_remove_keeps_lookup_structures_aligned(clock):
+    embeddings = {
+        "a": [1.0, 0.0, 0.0],
+        "b": [0.0, 1.0, 0.0],
+        "c": [0.0, 0.0, 1.0],
+        "d": [0.6, 0.8, 0.0],
+    }
+    cache = make_cache(embeddings, max_entries=3, similarity_threshold=0.99)
+    cache.put("a", {"answer": "a"}, namespace="one")
+    cache.put("b", {"answer": "b"}, namespace="two")
+    cache.put("c", {"answer": "c"}, namespace="one")
+    clock.now += 1
+    cache.get("b", namespace="two")
+    cache.get("c", namespace="one")
+
+    # "a" sits in slot 0, so evicting it moves "c" from the last slot into it
+    cache.put("d", {"answer": "d"}, namespace="two")
+
+    assert [entry.query_key for entry in cache._entries] == ["c", "b", "d"]
+    assert_consistent(cache, embeddings)
+    assert cache.get("c", namespace="one") == {"answer": "c"}
+    assert cache.get("a", namespace="one") is None
+
+    # Re-putting an existing key swap-removes the old entry before appending
+    cache.put("b", {"answer": "b2"}, namespace="two")
+    assert_consistent(cache, embeddings)
+    assert cache.get("b", namespace="two") == {"answer": "b2"}
+
+
+def test_non_positive_max_entries_disables_cache(clock):
+    cache = make_cache(max_entries=0)
+    cache.put("list pets", {"answer": "GET /pets"})
+
+    assert cache.get("list pets") is None
+    assert cache._entries == []
+
+
+def test_save_and_load_round_trip_replaces_file_atomically(clock, tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_cache_module, "EMBEDDINGS_AVAILABLE", False)
+    path = str(tmp_path / "cache" / "semantic_cache.pkl")
+    cache = make_cache()
+    cache.put("list pets", {"answer": "GET /pets"}, namespace="spec")
+    cache.save(path)
+
+    assert (tmp_path / "cache" / "semantic_cache.pkl").exists()
+    assert not (tmp_path / "cache" / "semantic_cache.pkl.tmp").exists()
+
+    restored = make_cache()
+    restored.load(path)
+    assert restored.get("list pets", namespace="spec") == {"answer": "GET /pets"}
+
+
+def test_embedding_model_is_loaded_once_under_concurrent_lookups(monkeypatch):
+    loads = []
+
+    class SlowModel:
+        def __init__(self, name):
+            loads.append(name)
+            time.sleep(0.05)
+
+        def encode(self, query, normalize_embeddings=True):
+            return [1.0, 0.0]
+
+    monkeypatch.setattr(semantic_cache_module, "EMBEDDINGS_AVAILABLE", True)
+    monkeypatch.setattr(semantic_cache_module, "SentenceTransformer", SlowModel, raising=False)
+    cache = SemanticCache()
+
+    threads = [threading.Thread(target=cache.get, args=("list pets",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [cache.model_name]